@@ -5,17 +5,36 @@
 
 # Author: Drihan du Preez #
 
+from startup_timer import Startup_Timer
+# boot phase durations, printed when the first sample arrives and by the GNSS button
+startup = Startup_Timer('first frame')
 import gui
 import vts
 import gnss
 import vbox
 import ustruct as us
+from array import array
 from micropython import const
 import vbo
 from image import Image_Bank
 from picture_button import Picture_Button
-from button_utils import LoopingButton
 from shape_V2 import Custom_Shape
+from session_log import Session_Logger
+from strip_chart import Strip_Chart
+from led_bar import LED_Bar
+from layout import Cell, Grid, unit_label
+from touch import Hit_Index, Touch_Router
+from page_manager import Page_Manager
+from channels import Channel_Table
+from sample_monitor import Sample_Monitor
+from settings_store import Settings_Store
+from math import sqrt, atan2, degrees
+from sample_ring import Sample_Ring
+from track_map import Track_Map
+from corners import Corner_Segmenter, MIN_SPEED, PEAK_LAT, PEAK_BRAKE, DURATION
+startup.mark('imports')
+# settings, gauges, the profiler and telemetry import their
+# modules when first used
 
 # Variables that need to be defined
 RED = const(0xFF0000)
@@ -24,15 +43,15 @@ WHITE = const(0xFFFFFF)
 BLACK = const(0x000000)
 sats_colour = [gui.DL_COLOR(RED)]
 sats = ["0"]
-sample = vbox.get_sample_hp()
+sats_used = 0
 logging_colour = [gui.DL_COLOR(RED)]
 log_toggle_display = [0]
+rec_text = ['REC']
 max_lat_acc_colour = [gui.DL_COLOR(BLACK)]
 max_long_acc_colour = [gui.DL_COLOR(BLACK)]
+max_combined_colour = [gui.DL_COLOR(BLACK)]
 gnss_status = False
-page = 0
 swipe_r = 50
-settings = False
 speed_mph = const(0)
 speed_kmh = const(1)
 ms2_accel = const(0)
@@ -41,53 +60,165 @@ speed_list = {
     speed_kmh: ("KM/H", 3.6),
     speed_mph: ("MPH", 2.2369362921),
     }
-speed_unit = 'Speed (mph)'
 acceleration_list = {
     g_accel: ("G", 9.81),
     ms2_accel: ("M/S^2", 1),
 }
-accel_unit = '(m/s )'
-accel_unit2 = '2'
-
-class Screen_Value:
-    """Class `Screen_Value` to determine the string value, multiplier, max value, and format"""
-    def __init__(self, formatter="{:.02f}", multiplier=0):
-        self.max_value = 0
-        self.value = 0
-        self.formatter = formatter
-        self.string_value = [formatter.format(self.value)]
-        self.multiplier = multiplier
-        self.max_string_value = [self.formatter.format(self.max_value)]
-
-    def update(self, value):
-        self.value = value * self.multiplier
-        self.string_value[0] = self.formatter.format(self.value)
-    
-    def max(self, value):
-        self.value = value
-        if abs(self.value) > abs(self.max_value):
-            self.max_value = self.value
-            self.max_string_value[0] = self.formatter.format(self.max_value)
-
-# values to be displayed and update 
-speedmph = Screen_Value("{:.02f}", 2.23693629)
-speedkph = Screen_Value("{:.02f}", 3.6)
-long_acc = Screen_Value("{:.02f}", 1)
-lat_acc = Screen_Value("{:.02f}", 1)
-max_long = Screen_Value("{:.02f}", 1)
-max_lat = Screen_Value("{:.02f}", 1)
-vertical_vel = Screen_Value("{:.02f}", 1)
-long_acc_g = Screen_Value("{:.02f}", 1/9.80665)
-lat_acc_g = Screen_Value("{:.02f}", 1/9.80665)
-max_long_g = Screen_Value("{:.02f}", 1/9.80665)
-max_lat_g = Screen_Value("{:.02f}", 1/9.80665)
+speed_options = [x[0] for x in speed_list.values()]
+accel_options = [x[0] for x in acceleration_list.values()]
+# settings page buttons, created when it's first opened
+speed_loopbutton = None
+acceleration_loopbutton = None
+# picture buttons of every layout created so far
+buttons = []
+# saved button choices, loaded before the first page is built
+config = Settings_Store('/sd/gforce.json', {
+    'speed': 'MPH',
+    'accel': 'M/S^2',
+})
+# unit key -> (text, superscript) used by the layout engine
+units = {
+    'speed': ('mph', ''),
+    'accel': ('m/s', '2'),
+    'vel': ('m/s', ''),
+    'angle': ('deg', ''),
+    'time': ('s', ''),
+    'none': ('', ''),
+}
+# record layout of the app session log, derived channels get appended here
+session_channels = (
+    ('time_ms', 'I'),
+    ('sats', 'B'),
+    ('speed_mps', 'f'),
+    ('lat_acc_mps2', 'f'),
+    ('long_acc_mps2', 'f'),
+    ('vert_vel_mps', 'f'),
+)
+session_log = Session_Logger(session_channels)
+# live stream of the session records to a receiver (python -m host.telemetry_rx),
+# None turns it off
+TELEMETRY_HOST = None
+telemetry = None
+if TELEMETRY_HOST:
+    from telemetry import Telemetry
+    telemetry = Telemetry(session_channels, TELEMETRY_HOST)
+SAMPLE_RATE_HZ = const(20)
+CHART_WINDOW_S = const(60)
+CHART_MAX_SPEED_MPS = const(70)
+CHART_MAX_G = const(2)
+# GAP/LAG under the satellite count when samples are lost or delivered late
+sample_monitor = Sample_Monitor(SAMPLE_RATE_HZ)
+# wraps the sample, frame and page build callbacks with the allocation profiler,
+# the GNSS icon then prints the report
+PROFILE = False
+profiler = None
+# LED bar: 'g' lights on the larger of lat/long G, 'shift' lights on speed (m/s)
+LED_MODE = 'g'
+LED_G_FULL = 1.0
+LED_G_WARN = 1.2
+LED_SHIFT_START_MPS = 20.0
+LED_SHIFT_FULL_MPS = 40.0
+LED_SHIFT_WARN_MPS = 42.0
+
+# raw inputs copied from each sample
+RAW_SPEED = const(0)
+RAW_LAT = const(1)
+RAW_LONG = const(2)
+RAW_VERT = const(3)
+RAW_COMBINED = const(4)
+RAW_DIRECTION = const(5)
+raw = array('f', [0.0] * 6)
+
+# fields the data callback copies into the handoff ring
+S_SATS = const(0)
+S_SPEED = const(1)
+S_LAT = const(2)
+S_LONG = const(3)
+S_VERT = const(4)
+S_LATPOS = const(5)
+S_LNGPOS = const(6)
+S_FIELDS = const(7)
+# on overflow the sample with the larger combined G is kept whole
+sample_ring = Sample_Ring(S_FIELDS, weigh=(S_LAT, S_LONG))
+
+# channel ids, values to be displayed and updated
+SPEED_MPH = const(0)
+SPEED_KMH = const(1)
+LAT_ACC = const(2)
+LONG_ACC = const(3)
+LAT_G = const(4)
+LONG_G = const(5)
+VERT_VEL = const(6)
+COMBINED_ACC = const(7)
+COMBINED_G = const(8)
+DIRECTION = const(9)
+channels = Channel_Table(10)
+channels.define(SPEED_MPH, RAW_SPEED, 2.23693629)
+channels.define(SPEED_KMH, RAW_SPEED, 3.6)
+channels.define(LAT_ACC, RAW_LAT, 1, True)
+channels.define(LONG_ACC, RAW_LONG, 1, True)
+# the G values feed the charts, LEDs, map, corners and gauges every sample
+channels.define(LAT_G, RAW_LAT, 1/9.80665, True, live=True)
+channels.define(LONG_G, RAW_LONG, 1/9.80665, True, live=True)
+channels.define(VERT_VEL, RAW_VERT, 1)
+channels.define(COMBINED_ACC, RAW_COMBINED, 1, True)
+channels.define(COMBINED_G, RAW_COMBINED, 1/9.80665, True, live=True)
+# direction of the combined vector, 0 accelerating, +-180 braking, +90 positive lateral
+channels.define(DIRECTION, RAW_DIRECTION, 1, fmt='{:.0f}')
+speed_ch = SPEED_MPH
+lat_ch = LAT_ACC
+long_ch = LONG_ACC
+combined_ch = COMBINED_ACC
+channels.set_active(speed_ch, lat_ch, long_ch, VERT_VEL, combined_ch, DIRECTION)
 trap_main = Custom_Shape([80, 215], 0, True, gui.RGB(0,0,0), gui.RGB(0, 36, 64), [118, 230], [118, 270], [80, 285])
 trap_no_bar = Custom_Shape([0, 215], 0, True, gui.RGB(0,0,0), gui.RGB(0, 36, 64), [38, 230], [38, 270], [0, 285])
-speed = speedmph
-accel1 = lat_acc
-accel2 = long_acc
-accel3 = max_lat
-accel4 = max_long
+speed_chart = Strip_Chart(10, 50, 780, 160, CHART_WINDOW_S, SAMPLE_RATE_HZ, 0, CHART_MAX_SPEED_MPS, gui.RGB(0, 36, 64))
+g_chart = Strip_Chart(10, 270, 780, 200, CHART_WINDOW_S, SAMPLE_RATE_HZ, -CHART_MAX_G, CHART_MAX_G,
+                      gui.RGB(200, 0, 0), gui.RGB(0, 150, 0))
+if LED_MODE == 'shift':
+    led_bar = LED_Bar(LED_SHIFT_FULL_MPS, LED_SHIFT_WARN_MPS, start=LED_SHIFT_START_MPS)
+else:
+    led_bar = LED_Bar(LED_G_FULL, LED_G_WARN, centre_out=True)
+touch_regions = Hit_Index()
+# the chevron tabs on the edge of the main and no bar pages
+touch_regions.add('main', 85, 220, 120, 280, lambda press: pages.show('no_bar'))
+touch_regions.add('no_bar', 0, 200, 40, 280, lambda press: pages.show('main'))
+touch = Touch_Router(touch_regions, swipe_r, on_swipe=lambda step: pages.step(step))
+pages = Page_Manager(touch)
+value_grid = Grid(2, (
+    Cell("Speed", 'speed', lambda: channels.text[speed_ch]),
+    Cell("Vertical Velocity", 'vel', lambda: channels.text[VERT_VEL]),
+    Cell("Lateral Accel", 'accel', lambda: channels.text[lat_ch]),
+    Cell("Long Accel", 'accel', lambda: channels.text[long_ch]),
+    Cell("Max Lateral Accel", 'accel', lambda: channels.max_text[lat_ch], max_lat_acc_colour),
+    Cell("Max Long Accel", 'accel', lambda: channels.max_text[long_ch], max_long_acc_colour),
+))
+track_map = Track_Map(0, 0, 800, 480)
+map_version = 0
+# start/finish flag, outline offsets in pixels
+START_MARKER = ((0, -14), (12, 7), (-12, 7))
+corners = Corner_Segmenter(SAMPLE_RATE_HZ)
+# last corner: name, duration, min speed, min speed change from the lap before, peak lateral, peak braking
+corner_text = [["-"] for _ in range(6)]
+corner_grid = Grid(2, (
+    Cell("Corner / Lap", 'none', lambda: corner_text[0]),
+    Cell("Duration", 'time', lambda: corner_text[1]),
+    Cell("Min Speed", 'speed', lambda: corner_text[2]),
+    Cell("Min Speed vs Last Lap", 'speed', lambda: corner_text[3]),
+    Cell("Peak Lateral", 'accel', lambda: corner_text[4]),
+    Cell("Peak Braking", 'accel', lambda: corner_text[5]),
+))
+combined_grid = Grid(1, (
+    Cell("Combined Accel", 'accel', lambda: channels.text[combined_ch]),
+    Cell("Direction", 'angle', lambda: channels.text[DIRECTION]),
+    Cell("Max Combined Accel", 'accel', lambda: channels.max_text[combined_ch], max_combined_colour),
+))
+# G gauges, always in g, filled green to red out from 0
+# created with the gauge page
+GAUGE_COLOURS = (gui.RGB(0, 150, 0), gui.RGB(255, 190, 0), gui.RGB(200, 0, 0))
+lat_gauge = None
+long_gauge = None
+combined_gauge = None
 
 # retrieves the picture button name and check if it matches in the list
 def get_picture_button(name):
@@ -101,7 +232,8 @@ def get_picture_button(name):
 def set_logging_status():
     status = vbo.get_status() & 2
     if not status:
-        logging_colour[0] = gui.DL_COLOR(WHITE)
+        # a failed start stays red until logging starts properly
+        logging_colour[0] = gui.DL_COLOR(WHITE if rec_text[0] == 'REC' else RED)
         get_picture_button('Record').set_colour((255, 255, 255))
     else:
         logging_colour[0] = gui.DL_COLOR(RED)
@@ -113,8 +245,19 @@ def toggle_logging(l):
         log_toggle_display[0] = 0 if log_toggle_display[0] else 0xffff
         if log_toggle_display[0]:
             vbo.start()
+            try:
+                session_log.start()
+            except OSError as e:
+                # e.g. a full card, don't leave the vbo logger running without it
+                print("session log:", e)
+                vbo.stop()
+                log_toggle_display[0] = 0
+                rec_text[0] = 'LOG ERR'
+                return
+            rec_text[0] = 'REC'
         else:
             vbo.stop()
+            session_log.stop()
     else:
         print("SD card not present")
 
@@ -129,20 +272,36 @@ def pass_cb(a):
     pass
 
 
+def print_profile(a):
+    startup.report()
+    sample_monitor.report()
+    sample_ring.report()
+    if profiler is not None:
+        profiler.report()
+
+
+def profiled(name, fn):
+    if profiler is None:
+        return fn
+    return profiler.wrap(name, fn)
+
+
 def rerun_main_screen(l):
-    main_screen()
+    pages.show('main')
+
+
+def open_settings(a):
+    pages.show('settings')
 
 
 # creating picture buttons and assigning callbacks
 def create_buttons(*args):
-    global buttons
-    buttons = []
     if 'Reset' in args:
         buttons.append(Picture_Button(5, 400, bank.get('Reset'), 'Reset', reset_max_values))
     if 'GNSS' in args:
-        buttons.append(Picture_Button(15, 10, bank.get('GNSS'), 'GNSS', pass_cb))
+        buttons.append(Picture_Button(15, 10, bank.get('GNSS'), 'GNSS', print_profile))
     if 'Settings' in args:
-        buttons.append(Picture_Button(-15, 280, bank.get('Settings'), 'Settings', settings_page))
+        buttons.append(Picture_Button(-15, 280, bank.get('Settings'), 'Settings', open_settings))
     if 'Record' in args:
         buttons.append(Picture_Button(5, 140, bank.get('Record'), 'Record', toggle_logging))
     if 'Exit' in args:
@@ -150,7 +309,8 @@ def create_buttons(*args):
 
     button_cbs_l = []
     button_icons_l = [gui.DL_BEGIN(gui.PRIM_BITMAPS)]
-    for i, button in enumerate(buttons):
+    # this layout's buttons are the ones just appended, earlier layouts stay ahead of them for get_picture_button
+    for i, button in enumerate(buttons[len(buttons) - len(args):]):
         button_cb_l = [
             gui.PARAM_TAG_REGISTER,
             wrap_callback(button.get_callback()),
@@ -161,77 +321,159 @@ def create_buttons(*args):
         button_icons_l.extend(button.generate_gui_l(i + 1))
     return button_cbs_l, button_icons_l
 
-# defining the swipe function and setting a callback for the relevant page
-def swipe_cb(gui_l, start):
-    global page
-    if start:
-        pass
-    else:
-        si = gui.swipe_info()
-        if si.dx <= -50:
-            if page == 0:
-                page += 1
-        elif si.dx >= 50:
-            if page > 0:
-                page -= 1
-        drawPage()
-
-# Draws the relevant page pending on the swipe
-def drawPage():
-    if page == 0:
-        return main_screen()
-    else:
-        return no_bar_screen()
-
-# creates button list
+# registers the pages, swipe order is the order they are registered in
+def init_pages():
+    pages.register('main', profiled('build main', main_screen), enter=led_bar.reset)
+    pages.register('no_bar', profiled('build no_bar', no_bar_screen))
+    pages.register('combined', profiled('build combined', combined_screen))
+    pages.register('gauges', profiled('build gauges', gauge_screen))
+    pages.register('chart', profiled('build chart', chart_screen))
+    pages.register('map', profiled('build map', map_screen))
+    pages.register('corner', profiled('build corner', corner_screen))
+    pages.register('settings', profiled('build settings', settings_page), leave=config.flush, swipe=False)
+
+# creates the main page button list, the settings page makes its own when first opened
 def init_buttons():
     global button_layouts
     button_layouts = {}
-    button_layouts['settings'] = create_buttons('Exit', 'GNSS')
     button_layouts['main'] = create_buttons('Reset', 'GNSS', 'Settings', 'Record')
 
+# creates the settings page buttons on its first build
+def init_settings():
+    global speed_loopbutton, acceleration_loopbutton
+    from button_utils import LoopingButton
+    speed_loopbutton = LoopingButton(500, 120, 200, 50, speed_options, 30, set_speed)
+    acceleration_loopbutton = LoopingButton(500, 240, 200, 50, accel_options, 30, set_accel)
+    speed_loopbutton.set_btn(config.get('speed'))
+    acceleration_loopbutton.set_btn(config.get('accel'))
+    button_layouts['settings'] = create_buttons('Exit', 'GNSS')
 
-def button_options():
-    global button_layouts
-    gui_buttons = []
+# creates the gauges on the gauge page's first build
+def init_gauges():
+    global lat_gauge, long_gauge, combined_gauge
+    from gauges import Bar_Gauge, Needle_Gauge
+    lat_gauge = Bar_Gauge(420, 90, 360, 60, -CHART_MAX_G, CHART_MAX_G, GAUGE_COLOURS)
+    long_gauge = Bar_Gauge(570, 220, 60, 240, -CHART_MAX_G, CHART_MAX_G, GAUGE_COLOURS, vertical=True)
+    combined_gauge = Needle_Gauge(200, 330, 150, 0, CHART_MAX_G)
 
-    if settings == False:
-        gui_buttons.extend(button_layouts['main'][0])
-        gui_buttons.append(button_layouts['main'][1])
-    elif settings == True:
-        gui_buttons.extend(button_layouts['settings'][0])
-        gui_buttons.append(button_layouts['settings'][1])
 
+def button_options(layout):
+    gui_buttons = []
+    gui_buttons.extend(button_layouts[layout][0])
+    gui_buttons.append(button_layouts[layout][1])
     return gui_buttons
     
-# optains a new GNSS sample and updates the display elements and sets the max values
+# copies the new GNSS sample into the handoff ring, process_samples does the rest
 def gnss_callback():
-    global sample
     sample = vbox.get_sample_hp()
-    sats[0] = "{}".format(sample.sats_used)
-    speedmph.update(sample.speed_gnd_mps)
-    speedkph.update(sample.speed_gnd_mps)
-    lat_acc.update(sample.latacc_smooth_mps2)
-    long_acc.update(sample.lngacc_smooth_mps2)
-    long_acc_g.update(sample.lngacc_smooth_mps2)
-    lat_acc_g.update(sample.latacc_smooth_mps2)
-    vertical_vel.update(sample.speed_up_mps)
+    sample_monitor.check(sample.utc_time_ms)
+    v = sample_ring.values
+    i = sample_ring.reserve()
+    v[i + S_SATS] = sample.sats_used
+    v[i + S_SPEED] = sample.speed_gnd_mps
+    v[i + S_LAT] = sample.latacc_smooth_mps2
+    v[i + S_LONG] = sample.lngacc_smooth_mps2
+    v[i + S_VERT] = sample.speed_up_mps
+    v[i + S_LATPOS] = sample.lat_rad
+    v[i + S_LNGPOS] = sample.lng_rad
+    sample_ring.commit(sample.utc_time_ms)
+    sample_monitor.done()
+
+# drains the handoff ring, updates the display elements and sets the max values
+def process_samples():
+    global sats_used
+    slot = sample_ring.peek()
+    if slot < 0:
+        return
+    if not startup.done:
+        startup.finish('first sample')
+    depth = sample_ring.head - sample_ring.tail
+    v = sample_ring.values
+    while slot >= 0:
+        i = slot * S_FIELDS
+        sats_used = int(v[i + S_SATS])
+        speed = v[i + S_SPEED]
+        lat = v[i + S_LAT]
+        lng = v[i + S_LONG]
+        vert = v[i + S_VERT]
+        raw[RAW_SPEED] = speed
+        raw[RAW_LAT] = lat
+        raw[RAW_LONG] = lng
+        raw[RAW_VERT] = vert
+        # math.sqrt/atan2 are C; fast_math only pays off if fast_math.benchmark() on the unit says so
+        raw[RAW_COMBINED] = sqrt(lat * lat + lng * lng)
+        raw[RAW_DIRECTION] = degrees(atan2(lat, lng))
+        # maxima are tracked per sample, text is only formatted for the last one
+        channels.update(raw, False)
+        speed_chart.add(speed)
+        g_chart.add(channels.values[LAT_G], channels.values[LONG_G])
+        if LED_MODE == 'shift':
+            led_bar.update(speed)
+        else:
+            led_bar.update(max(abs(channels.values[LAT_G]), abs(channels.values[LONG_G])))
+        if sats_used > 3:
+            first = not track_map.count
+            east, north = track_map.project(v[i + S_LATPOS], v[i + S_LNGPOS])
+            track_map.add_local(east, north, channels.values[LAT_G], channels.values[LONG_G])
+            if first:
+                track_map.mark(GREEN, START_MARKER)
+            if corners.update(speed, channels.values[LAT_G], channels.values[LONG_G], east, north):
+                show_corner()
+        if session_log.active:
+            session_log.log(sample_ring.times[slot], sats_used, speed, lat, lng, vert)
+        if telemetry is not None:
+            telemetry.push(sample_ring.times[slot], sats_used, speed, lat, lng, vert)
+        sample_ring.release()
+        slot = sample_ring.peek()
+    # LAG when this loop, not the GNSS delivery, is what fell behind
+    sample_monitor.drained(depth, sample_ring.last_latency_us, sample_ring.folded)
+    # gauges move in place, only the newest sample can be seen
+    if lat_gauge is not None:
+        lat_gauge.update(channels.values[LAT_G])
+        long_gauge.update(channels.values[LONG_G])
+        combined_gauge.update(channels.values[COMBINED_G])
+    channels.format_active()
+    sats[0] = "{}".format(sats_used)
     set_sats_status(gnss_status)
     set_max_values()
+    refresh_map()
+
+# formats the last recorded corner in the selected units
+def show_corner():
+    cid = corners.last_id
+    lap = corners.last_lap
+    if cid < 0:
+        return
+    speed_mult = channels.mult[speed_ch]
+    g_mult = channels.mult[lat_ch] / channels.mult[LAT_G]
+    min_speed = corners.get(cid, lap, MIN_SPEED)
+    before = corners.get(cid, lap - 1, MIN_SPEED)
+    corner_text[0][0] = "{} / {}".format(cid + 1, lap + 1)
+    corner_text[1][0] = "{:.1f}".format(corners.get(cid, lap, DURATION))
+    corner_text[2][0] = "{:.1f}".format(min_speed * speed_mult)
+    corner_text[3][0] = "-" if before is None else "{:+.1f}".format((min_speed - before) * speed_mult)
+    corner_text[4][0] = "{:.2f}".format(corners.get(cid, lap, PEAK_LAT) * g_mult)
+    corner_text[5][0] = "{:.2f}".format(corners.get(cid, lap, PEAK_BRAKE) * g_mult)
+
+# rebuilds the map page when the map got a new marker, refits move the words in place
+def refresh_map():
+    global map_version
+    if track_map.version != map_version:
+        map_version = track_map.version
+        pages.invalidate('map')
+        if pages.current == 'map':
+            pages.show('map')
 
 # handles the max values and updates the colour when appropriate
 def set_max_values():
-    if speedmph.value < 0.5 or speedkph.value < 0.5 or sample.sats_used == 0:
-        speedmph.string_value[0] = "0.00"
-        speedkph.string_value[0] = "0.00"
-    max_long.max(long_acc.value)
-    max_lat.max(lat_acc.value)
-    max_lat_g.max(lat_acc_g.value)
-    max_long_g.max(long_acc_g.value)
-    if abs(max_lat.max_value) > 9.81 or abs(max_lat_g.max_value) > 1:
+    if raw[RAW_SPEED] * channels.mult[SPEED_MPH] < 0.5 or sats_used == 0:
+        channels.text[speed_ch][0] = channels.zero_text
+    if abs(channels.maxima[LAT_G]) > 1:
         max_lat_acc_colour[0] = gui.DL_COLOR(RED)
-    if abs(max_long.max_value) > 9.81 or abs(max_long_g.max_value) > 1:
+    if abs(channels.maxima[LONG_G]) > 1:
         max_long_acc_colour[0] = gui.DL_COLOR(RED)
+    if channels.maxima[COMBINED_G] > 1:
+        max_combined_colour[0] = gui.DL_COLOR(RED)
 
 #sets the gnss button colour
 def set_gnss_btn_state(state):
@@ -243,7 +485,7 @@ def set_gnss_btn_state(state):
 # sets the satellite counter colour
 def set_sats_status(state):
     global gnss_status
-    if sample.sats_used > 3:
+    if sats_used > 3:
         sats_colour[0] = gui.DL_COLOR(GREEN)
         gnss_status = True
     else:
@@ -252,16 +494,10 @@ def set_sats_status(state):
 
 # resets the max values when the reset button is pressed
 def reset_max_values(a):
-    max_long.max_value = 0
-    max_lat.max_value = 0
-    max_long_g.max_value = 0
-    max_lat_g.max_value = 0
-    max_long.max_string_value[0] = "0.00"
-    max_lat.max_string_value[0] = "0.00"
-    max_long_g.max_string_value[0] = "0.00"
-    max_lat_g.max_string_value[0] = "0.00"
+    channels.reset_max()
     max_long_acc_colour[0] = gui.DL_COLOR(BLACK)
     max_lat_acc_colour[0] = gui.DL_COLOR(BLACK)
+    max_combined_colour[0] = gui.DL_COLOR(BLACK)
 
 # sends command to the gnss engine to do a gps coldstart
 def gnss_coldstart(engine):
@@ -270,56 +506,63 @@ def gnss_coldstart(engine):
 
 def vsync_cb(b):
     global gnss_status
+    if not startup.framed:
+        startup.mark('first frame')
+    process_samples()
     set_gnss_btn_state(gnss_status)
     set_logging_status()
+    session_log.flush()
+    config.service()
+    if telemetry is not None:
+        telemetry.service()
     gui.redraw()
+    pages.idle()
 
 
 def set_speed(btn):
-    global speed_unit, speed
-    if btn.current == 'MPH':
-        speed_unit = 'Speed (mph)'
-        speed = speedmph
+    use_speed(btn.current)
+
+
+def use_speed(name):
+    global speed_ch
+    if name == 'MPH':
+        units['speed'] = ('mph', '')
+        speed_ch = SPEED_MPH
     else:
-        speed_unit = 'Speed (km/h)'
-        speed = speedkph
+        units['speed'] = ('km/h', '')
+        speed_ch = SPEED_KMH
+    config.set('speed', name)
+    channels.set_active(speed_ch, lat_ch, long_ch, VERT_VEL, combined_ch, DIRECTION)
+    show_corner()
+    pages.invalidate()
 
 
 def set_accel(btn):
-    global accel_unit, accel_unit2, accel1, accel2, accel3, accel4
-    if btn.current == 'M/S^2':
-        accel_unit = '(m/s )'
-        accel_unit2 = '2'
-        accel1 = lat_acc
-        accel2 = long_acc
-        accel3 = max_long
-        accel4 = max_lat
-    else:
-        accel_unit = '(g)'
-        accel_unit2 = ''
-        accel1 = lat_acc_g
-        accel2 = long_acc_g
-        accel3 = max_long_g
-        accel4 = max_lat_g
-
-
-def bar_press(press):
-    global page
-    if page == 0:
-        if press[3] > 85 and press[3] < 120 and press[4] > 220 and press[4] < 280:
-            page = 1
-            no_bar_screen()
-    elif page == 1:
-        if press[3] > 0 and press[3] < 40 and press[4] > 200 and press[4] < 280:
-            page = 0
-            main_screen()
+    use_accel(btn.current)
+
+
+def use_accel(name):
+    global lat_ch, long_ch, combined_ch
+    if name == 'M/S^2':
+        units['accel'] = ('m/s', '2')
+        lat_ch = LAT_ACC
+        long_ch = LONG_ACC
+        combined_ch = COMBINED_ACC
     else:
-        pass
+        units['accel'] = ('g', '')
+        lat_ch = LAT_G
+        long_ch = LONG_G
+        combined_ch = COMBINED_G
+    config.set('accel', name)
+    channels.set_active(speed_ch, lat_ch, long_ch, VERT_VEL, combined_ch, DIRECTION)
+    show_corner()
+    pages.invalidate()
+
 
 # Settings page gui list
-def settings_page(a):
-    global settings
-    settings = True
+def settings_page():
+    if speed_loopbutton is None:
+        init_settings()
     settings_gui = [
         [gui.EVT_VSYNC, vsync_cb],
         [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
@@ -343,71 +586,50 @@ def settings_page(a):
         sats_colour,
         [gui.CTRL_TEXT, 65, 40, 23, gui.OPT_CENTERX, sats],
         ]
-    settings_gui.extend(button_options())
+    settings_gui.extend(button_options('settings'))
     settings_gui.extend([
         speed_loopbutton(),
         acceleration_loopbutton(),
         [gui.CTRL_BUTTON, 500, 360, 200, 60, 30, 'Coldstart', gnss_coldstart],
         ])
-    gui.show(settings_gui)
+    return settings_gui
+
+# gui list for the strip chart page, the charts are updated in place by gnss_callback
+def chart_screen():
+    top_speed = "{:.0f}".format(CHART_MAX_SPEED_MPS * channels.mult[speed_ch])
+    chart_list = [
+        [gui.EVT_VSYNC, vsync_cb],
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
+        [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
+        [gui.DL_COLOR_RGB(0, 0, 0)],
+        [gui.CTRL_TEXT, 10, 10, 30, 0, unit_label("Speed", units['speed'])],
+        [gui.CTRL_TEXT, 790, 10, 28, gui.OPT_RIGHTX, "{} s".format(CHART_WINDOW_S)],
+        [gui.CTRL_TEXT, 14, 52, 26, 0, top_speed],
+        speed_chart(),
+        [gui.DL_COLOR_RGB(0, 0, 0)],
+        [gui.CTRL_TEXT, 10, 230, 30, 0, "Accel (g)"],
+        [gui.CTRL_TEXT, 14, 272, 26, 0, "+{}".format(CHART_MAX_G)],
+        [gui.CTRL_TEXT, 14, 448, 26, 0, "-{}".format(CHART_MAX_G)],
+        [gui.DL_COLOR_RGB(200, 0, 0)],
+        [gui.CTRL_TEXT, 600, 230, 28, 0, "Lateral"],
+        [gui.DL_COLOR_RGB(0, 150, 0)],
+        [gui.CTRL_TEXT, 700, 230, 28, 0, "Long"],
+        g_chart(),
+    ]
+    return chart_list
 
 # gui list for the no bar page
 def no_bar_screen():
     no_bar_list = [
         trap_no_bar(),
         [gui.EVT_VSYNC, vsync_cb],
-        [gui.EVT_SWIPE, swipe_r, swipe_cb],
-        [gui.EVT_PRESS, bar_press],
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
         [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
-        [gui.DL_COLOR_RGB(200, 200, 200)],
-        [gui.PRIM_RECTS, [
-            gui.DL_VERTEX2F(0, 0),
-            gui.DL_VERTEX2F(800, 50)
-        ]],
-        [gui.PRIM_RECTS, [
-            gui.DL_VERTEX2F(0, 160),
-            gui.DL_VERTEX2F(800, 210)
-        ]],
-        [gui.PRIM_RECTS, [
-            gui.DL_VERTEX2F(0, 320),
-            gui.DL_VERTEX2F(800, 370)
-        ]],
-        [gui.DL_COLOR_RGB(0, 0, 0)],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(2),
-            gui.DL_VERTEX2F(400, 0),
-            gui.DL_VERTEX2F(800, 0),
-            gui.DL_VERTEX2F(800, 480),
-            gui.DL_VERTEX2F(0, 480),
-            gui.DL_VERTEX2F(0, 0),
-            gui.DL_VERTEX2F(400, 0),
-            gui.DL_VERTEX2F(400, 480),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(1),
-            gui.DL_VERTEX2F(0, 50),
-            gui.DL_VERTEX2F(800, 50),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(1),
-            gui.DL_VERTEX2F(0, 210),
-            gui.DL_VERTEX2F(800, 210),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(1),
-            gui.DL_VERTEX2F(0, 370),
-            gui.DL_VERTEX2F(800, 370),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(2),
-            gui.DL_VERTEX2F(0, 160),
-            gui.DL_VERTEX2F(800, 160),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(2),
-            gui.DL_VERTEX2F(0, 320),
-            gui.DL_VERTEX2F(800, 320),
-        ]],
+    ]
+    no_bar_list.extend(value_grid.compile(0, 800, units))
+    no_bar_list.extend([
         [gui.DL_COLOR_RGB(0, 0, 0)],
         [gui.PRIM_LINE_STRIP, [
             gui.DL_LINE_WIDTH(1.5),
@@ -429,39 +651,70 @@ def no_bar_screen():
             gui.DL_VERTEX2F(30, 250),
             gui.DL_VERTEX2F(20, 260),
         ]],
+    ])
+    return no_bar_list
+
+# gui list for the last corner page
+def corner_screen():
+    corner_list = [
+        [gui.EVT_VSYNC, vsync_cb],
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
+        [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
+    ]
+    corner_list.extend(corner_grid.compile(0, 800, units))
+    return corner_list
+
+# gui list for the track map page
+def map_screen():
+    map_list = [
+        [gui.EVT_VSYNC, vsync_cb],
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
+        [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
+    ]
+    map_list.extend(track_map())
+    return map_list
+
+# gui list for the G gauges page, the gauges are updated in place by process_samples
+def gauge_screen():
+    if lat_gauge is None:
+        init_gauges()
+    gauge_list = [
+        [gui.EVT_VSYNC, vsync_cb],
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
+        [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
         [gui.DL_COLOR_RGB(0, 0, 0)],
-        [gui.CTRL_TEXT, 10, 10, 30, 0, speed_unit],
-        [gui.CTRL_TEXT, 10, 170, 30, 0, "Lateral Accel " + accel_unit],
-        [gui.CTRL_TEXT, 269, 170, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 10, 330, 30, 0, "Max Lateral Accel " + accel_unit],
-        [gui.CTRL_TEXT, 335, 330, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 410, 10, 30, 0, "Vertical Velocity (m/s)"],
-        [gui.CTRL_TEXT, 410, 170, 30, 0, "Long Accel " + accel_unit],
-        [gui.CTRL_TEXT, 642, 170, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 410, 330, 30, 0, "Max Long Accel " + accel_unit],
-        [gui.CTRL_TEXT, 709, 330, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 200, 50, 34, gui.OPT_CENTERX, speed.string_value],
-        [gui.CTRL_TEXT, 600, 50, 34, gui.OPT_CENTERX, vertical_vel.string_value],
-        [gui.CTRL_TEXT, 200, 210, 34, gui.OPT_CENTERX, accel1.string_value],
-        [gui.CTRL_TEXT, 600, 210, 34, gui.OPT_CENTERX, accel2.string_value],
-        max_lat_acc_colour,
-        [gui.CTRL_TEXT, 200, 370, 34, gui.OPT_CENTERX, accel4.max_string_value],
-        max_long_acc_colour,
-        [gui.CTRL_TEXT, 600, 370, 34, gui.OPT_CENTERX, accel3.max_string_value],
+        [gui.CTRL_TEXT, 200, 20, 30, gui.OPT_CENTERX, "Combined (g)"],
+        [gui.CTRL_TEXT, 200, 350, 28, gui.OPT_CENTERX, "0 - {}".format(CHART_MAX_G)],
+        [gui.CTRL_TEXT, 600, 20, 30, gui.OPT_CENTERX, "Lateral (g)"],
+        [gui.CTRL_TEXT, 420, 160, 26, 0, "-{}".format(CHART_MAX_G)],
+        [gui.CTRL_TEXT, 780, 160, 26, gui.OPT_RIGHTX, "+{}".format(CHART_MAX_G)],
+        [gui.CTRL_TEXT, 650, 320, 30, 0, "Long (g)"],
+    ]
+    gauge_list.extend(combined_gauge())
+    gauge_list.extend(lat_gauge())
+    gauge_list.extend(long_gauge())
+    return gauge_list
+
+# gui list for the combined G page
+def combined_screen():
+    combined_list = [
+        [gui.EVT_VSYNC, vsync_cb],
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
+        [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
     ]
-    gui.show(no_bar_list)
+    combined_list.extend(combined_grid.compile(0, 800, units))
+    return combined_list
 
 # gui list for the page with a side bar
 def main_screen():
-    global main_display, settings
-    settings = False
-    vts.leds(* ([0] * 12))
     main_display = [
         [gui.EVT_VSYNC, vsync_cb],
-        [gui.EVT_SWIPE, swipe_r, swipe_cb],
-        [gui.EVT_PRESS, bar_press],
-        ]
-    main_display.extend([
+        [gui.EVT_SWIPE, swipe_r, touch.swipe_cb],
+        [gui.EVT_PRESS, touch.press_cb],
         trap_main(),
         [gui.PARAM_CLRCOLOR, gui.RGB(255, 255, 255)],
         [gui.DL_COLOR_RGB(0, 36, 64)],
@@ -469,55 +722,10 @@ def main_screen():
             gui.DL_VERTEX2F(0, 0),
             gui.DL_VERTEX2F(80, 480)
         ]],
-        [gui.DL_COLOR_RGB(200, 200, 200)],
-        [gui.PRIM_RECTS, [
-            gui.DL_VERTEX2F(80, 0),
-            gui.DL_VERTEX2F(800, 50)
-        ]],
-        [gui.PRIM_RECTS, [
-            gui.DL_VERTEX2F(80, 160),
-            gui.DL_VERTEX2F(800, 210)
-        ]],
-        [gui.PRIM_RECTS, [
-            gui.DL_VERTEX2F(80, 320),
-            gui.DL_VERTEX2F(800, 370)
-        ]],
+    ]
+    main_display.extend(value_grid.compile(80, 720, units))
+    main_display.extend([
         [gui.DL_COLOR_RGB(0, 0, 0)],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(2),
-            gui.DL_VERTEX2F(440, 0),
-            gui.DL_VERTEX2F(800, 0),
-            gui.DL_VERTEX2F(800, 480),
-            gui.DL_VERTEX2F(80, 480),
-            gui.DL_VERTEX2F(80, 0),
-            gui.DL_VERTEX2F(440, 0),
-            gui.DL_VERTEX2F(440, 480),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(1),
-            gui.DL_VERTEX2F(80, 50),
-            gui.DL_VERTEX2F(800, 50),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(1),
-            gui.DL_VERTEX2F(80, 210),
-            gui.DL_VERTEX2F(800, 210),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(1),
-            gui.DL_VERTEX2F(80, 370),
-            gui.DL_VERTEX2F(800, 370),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(2),
-            gui.DL_VERTEX2F(80, 160),
-            gui.DL_VERTEX2F(800, 160),
-        ]],
-        [gui.PRIM_LINE_STRIP, [
-            gui.DL_LINE_WIDTH(2),
-            gui.DL_VERTEX2F(80, 320),
-            gui.DL_VERTEX2F(800, 320),
-        ]],
         [gui.PRIM_LINE_STRIP, [
             gui.DL_LINE_WIDTH(1.5),
             gui.DL_VERTEX2F(80, 215),
@@ -538,50 +746,59 @@ def main_screen():
             gui.DL_VERTEX2F(90, 250),
             gui.DL_VERTEX2F(100, 260),
         ]],
-        [gui.DL_COLOR_RGB(0, 0, 0)],
-        [gui.CTRL_TEXT, 90, 10, 30, 0, speed_unit],
-        [gui.CTRL_TEXT, 90, 170, 30, 0, "Lateral Velocity " + accel_unit],
-        [gui.CTRL_TEXT, 382, 170, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 90, 330, 30, 0, "Max Lateral Accel " + accel_unit],
-        [gui.CTRL_TEXT, 415, 330, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 450, 10, 30, 0, "Vertical Velocity (m/s)"],
-        [gui.CTRL_TEXT, 450, 170, 30, 0, "Long Accel " + accel_unit],
-        [gui.CTRL_TEXT, 680, 170, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 450, 330, 30, 0, "Max Long Accel " + accel_unit],
-        [gui.CTRL_TEXT, 748, 330, 23, gui.OPT_CENTERX, accel_unit2],
-        [gui.CTRL_TEXT, 260, 50, 34, gui.OPT_CENTERX, speed.string_value],
-        [gui.CTRL_TEXT, 620, 50, 34, gui.OPT_CENTERX, vertical_vel.string_value],
-        [gui.CTRL_TEXT, 260, 210, 34, gui.OPT_CENTERX, accel1.string_value],
-        [gui.CTRL_TEXT, 620, 210, 34, gui.OPT_CENTERX, accel2.string_value],
-        max_lat_acc_colour,
-        [gui.CTRL_TEXT, 260, 370, 34, gui.OPT_CENTERX, accel4.max_string_value],
-        max_long_acc_colour,
-        [gui.CTRL_TEXT, 620, 370, 34, gui.OPT_CENTERX, accel3.max_string_value],
         [gui.DL_COLOR_RGB(255, 255, 255)],
         sats_colour,
         [gui.CTRL_TEXT, 65, 40, 23, gui.OPT_CENTERX, sats],
+        sample_monitor.colour,
+        [gui.CTRL_TEXT, 65, 66, 21, gui.OPT_CENTERX, sample_monitor.text],
         logging_colour,
-        [gui.CTRL_TEXT, 15, 120, 30, 0, "REC"],
-    ]) 
-    main_display.extend(button_options())
-    gui.show(main_display)
+        [gui.CTRL_TEXT, 15, 120, 30, 0, rec_text],
+    ])
+    main_display.extend(button_options('main'))
+    return main_display
+
+# applies the saved units before any page is built
+def load_settings():
+    config.load()
+    for name, options, apply in (('speed', speed_options, use_speed), ('accel', accel_options, use_accel)):
+        if config.get(name) not in options:
+            config.set(name, config.defaults[name])
+        apply(config.get(name))
 
 # main application that loads in the images, runs the functions, and checking for GPS signal
 def main():
-    global bank, speed_loopbutton, acceleration_loopbutton
-    speed_loopbutton = LoopingButton(500, 120, 200, 50, [x[0] for x in speed_list.values()], 30, set_speed)
-    acceleration_loopbutton = LoopingButton(500, 240, 200, 50, [x[0] for x in acceleration_list.values()], 30, set_accel)
+    global bank, profiler, gnss_callback, vsync_cb, process_samples
+    startup.mark('globals')
+    if PROFILE:
+        from alloc_profile import Alloc_Profiler
+        profiler = Alloc_Profiler()
+        gnss_callback = profiler.wrap('gnss_callback', gnss_callback)
+        process_samples = profiler.wrap('process_samples', process_samples)
+        vsync_cb = profiler.wrap('vsync_cb', vsync_cb)
+    load_settings()
+    startup.mark('load_settings')
+    if telemetry is not None:
+        try:
+            telemetry.start()
+        except OSError as e:
+            print("telemetry:", e)
+    # the exit icon is only on the settings page
     bank = Image_Bank((
         ('/sd/icon-reset.png', 'Reset'),
         ('/sd/icons8-gnss-50.png', 'GNSS'),
         ('/sd/icon-settings.png', 'Settings'),
         ('/sd/icon-record.png', 'Record'),
         ('/sd/icon-exit.png', 'Exit'),
-    ))
+    ), lazy=('Exit',))
+    startup.mark('Image_Bank')
     init_buttons()
-    main_screen()
+    startup.mark('init_buttons')
+    init_pages()
+    pages.show('main')
+    startup.mark('first gui.show')
     while (gnss.init_status() > 0):
         pass
+    startup.mark('GNSS ready')
     try:
         vbox.init(vbox.VBOX_SRC_GNSS_BASIC)
     except Exception as e:
@@ -590,6 +807,7 @@ def main():
         else:
             print(e)
     vbox.set_new_data_callback(gnss_callback)
+    startup.mark('vbox init')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,104 @@
+##
+# @module    alloc_profile
+# @brief     Heap allocation and GC pause profiler for callbacks
+# @version   1.0
+##
+
+# Wraps callbacks so every call samples gc.mem_alloc() and ticks_us()
+# before and after. A drop in allocated memory across a call means a
+# collection ran inside it, and that call's duration is counted as a GC
+# pause. Once a callback is past its warm up calls, any call that still
+# allocates is counted as a steady state allocation and the callback is
+# flagged in the report. Stats live in preallocated arrays so the
+# profiler itself doesn't allocate per call.
+# Each report covers the calls since the previous one and starts a new
+# window. The byte and time sums also start a new window by themselves
+# before they outgrow a small int (reading a bigger one from the array
+# would allocate), so they can't overflow however long the session runs;
+# `windows` in the report counts those.
+
+import gc
+import utime
+from array import array
+from micropython import const
+
+CALLS = const(0)
+ALLOC_BYTES = const(1)
+MAX_ALLOC = const(2)
+STEADY_ALLOCS = const(3)
+GC_RUNS = const(4)
+GC_MAX_US = const(5)
+TOTAL_US = const(6)
+MAX_US = const(7)
+WARM = const(8)
+WINDOWS = const(9)
+_FIELDS = const(10)
+# sums start a new window past this, well inside the device's 31 bit small ints
+_SUM_LIMIT = const(1 << 28)
+
+
+class Alloc_Profiler:
+
+    def __init__(self, warmup=50):
+        """
+        Args:
+            warmup (int): calls per callback before allocations count as steady state
+        """
+        self.warmup = warmup
+        self.stats = {}
+
+    def wrap(self, name, fn):
+        stats = array('l', [0] * _FIELDS)
+        self.stats[name] = stats
+        warmup = self.warmup
+
+        def profiled(*args):
+            before = gc.mem_alloc()
+            start = utime.ticks_us()
+            ret = fn(*args)
+            took = utime.ticks_diff(utime.ticks_us(), start)
+            allocated = gc.mem_alloc() - before
+            if stats[TOTAL_US] > _SUM_LIMIT or stats[ALLOC_BYTES] > _SUM_LIMIT:
+                stats[CALLS] = 0
+                stats[TOTAL_US] = 0
+                stats[ALLOC_BYTES] = 0
+                stats[WINDOWS] += 1
+            if stats[WARM] <= warmup:
+                stats[WARM] += 1
+            stats[CALLS] += 1
+            stats[TOTAL_US] += took
+            if took > stats[MAX_US]:
+                stats[MAX_US] = took
+            if allocated < 0:
+                stats[GC_RUNS] += 1
+                if took > stats[GC_MAX_US]:
+                    stats[GC_MAX_US] = took
+            elif allocated > 0:
+                stats[ALLOC_BYTES] += allocated
+                if allocated > stats[MAX_ALLOC]:
+                    stats[MAX_ALLOC] = allocated
+                if stats[WARM] > warmup:
+                    stats[STEADY_ALLOCS] += 1
+            return ret
+        return profiled
+
+    def report(self):
+        """Prints the stats of the calls since the last report and starts a new window."""
+        print('alloc profile: free {} alloc {}'.format(gc.mem_free(), gc.mem_alloc()))
+        for name, s in self.stats.items():
+            calls = s[CALLS] or 1
+            print('{:<14} calls {:>7} avg {:>5} us max {:>6} us  alloc {:>6} B/call max {:>5} B  '
+                  'gc {:>3} max {:>6} us{}{}'.format(
+                      name, s[CALLS], s[TOTAL_US] // calls, s[MAX_US], s[ALLOC_BYTES] // calls,
+                      s[MAX_ALLOC], s[GC_RUNS], s[GC_MAX_US],
+                      '  windows {}'.format(s[WINDOWS] + 1) if s[WINDOWS] else '',
+                      '  STEADY STATE ALLOC x{}'.format(s[STEADY_ALLOCS]) if s[STEADY_ALLOCS] else ''))
+            for i in range(_FIELDS):
+                if i != WARM:
+                    s[i] = 0
+
+    def reset(self):
+        """Forgets everything, including which callbacks are past their warm up."""
+        for s in self.stats.values():
+            for i in range(_FIELDS):
+                s[i] = 0
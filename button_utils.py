@@ -72,6 +72,7 @@ class LoopingButton:
         elif idx != None:
             self.idx = idx
             self.text[0] = str(self.options[self.idx])
+        self.current = self.options[self.idx]
 
     def get_value(self):
         return self.current
@@ -0,0 +1,130 @@
+##
+# @module    channels
+# @brief     Array backed table of displayed channels and their maxima
+# @version   1.0
+##
+
+# Replaces one object per displayed value with flat arrays indexed by an
+# integer channel id. Every channel is a raw input times a positive
+# multiplier, so the largest magnitude of every channel of an input comes
+# from the same sample: maxima are tracked once per raw input and only
+# written to the channels when a new peak arrives, so switching units never
+# loses a max. A sample only derives the values of the live channels, the
+# active ones plus those defined `live` because they're read every sample;
+# any other value is stale until set_active() brings it back on screen.
+# Text is only formatted for the channels currently on screen.
+# Display lists hold the one element text lists, so they never change identity.
+# Channels use the table's format unless given their own (e.g. whole degrees).
+
+from array import array
+
+
+class Channel_Table:
+    __slots__ = ('count', 'src', 'mult', 'track', 'keep', 'values', 'maxima', 'text', 'max_text',
+                 'active', 'active_ids', 'live', 'raw', 'peak', 'peak_src', 'of_src', 'fmt', 'fmts',
+                 'zero_text')
+
+    def __init__(self, count, fmt='{:.02f}'):
+        self.count = count
+        self.fmt = fmt
+        self.zero_text = fmt.format(0)
+        self.fmts = [fmt] * count
+        self.src = array('B', [0] * count)
+        self.mult = array('f', [1.0] * count)
+        self.track = array('B', [0] * count)
+        self.keep = array('B', [0] * count)
+        self.values = array('f', [0.0] * count)
+        self.maxima = array('f', [0.0] * count)
+        self.active = array('B', [0] * count)
+        self.active_ids = ()
+        self.live = array('B')
+        self.raw = None
+        self.peak = array('f')
+        self.peak_src = array('B')
+        self.of_src = ()
+        self.text = [[self.zero_text] for _ in range(count)]
+        self.max_text = [[self.zero_text] for _ in range(count)]
+
+    def define(self, ch, src, mult=1.0, track_max=False, fmt=None, live=False):
+        """
+        Args:
+            ch (int): channel id
+            src (int): index of the raw input this channel is derived from
+            mult (float): unit conversion applied to the raw input, positive
+            track_max (bool): keep the largest magnitude seen since the last reset
+            fmt (str, optional): format for this channel instead of the table's
+            live (bool): derive the value every sample even when it's not on screen
+        """
+        self.src[ch] = src
+        self.mult[ch] = mult
+        self.track[ch] = 1 if track_max else 0
+        self.keep[ch] = 1 if live else 0
+        if fmt is not None:
+            self.fmts[ch] = fmt
+            self.text[ch][0] = fmt.format(0)
+            self.max_text[ch][0] = fmt.format(0)
+        # setup only, so rebuilding the peak tables (and losing their peaks) is fine
+        inputs = max(self.src) + 1
+        self.peak = array('f', [0.0] * inputs)
+        self.of_src = tuple(tuple(i for i in range(self.count) if self.track[i] and self.src[i] == s)
+                            for s in range(inputs))
+        self.peak_src = array('B', [s for s in range(inputs) if self.of_src[s]])
+        self._set_live()
+
+    def _set_live(self):
+        self.live = array('B', [i for i in range(self.count) if self.keep[i] or self.active[i]])
+
+    def set_active(self, *ids):
+        """Selects the channels whose text is kept up to date and refreshes it."""
+        for i in range(self.count):
+            self.active[i] = 0
+        for i in ids:
+            self.active[i] = 1
+            if self.raw is not None:
+                self.values[i] = self.raw[self.src[i]] * self.mult[i]
+            self.text[i][0] = self.fmts[i].format(self.values[i])
+            self.max_text[i][0] = self.fmts[i].format(self.maxima[i])
+        self.active_ids = ids
+        self._set_live()
+
+    def update(self, raw, text=True):
+        """Derives the live channels from `raw` (an array of inputs) and formats the active ones.
+
+        Pass text=False for all but the last of a batch of samples, maxima are
+        still tracked (and their text kept current) for every sample.
+        """
+        values = self.values
+        src = self.src
+        mult = self.mult
+        peak = self.peak
+        self.raw = raw
+        for i in self.live:
+            values[i] = raw[src[i]] * mult[i]
+        for s in self.peak_src:
+            v = raw[s]
+            if abs(v) > abs(peak[s]):
+                peak[s] = v
+                self._new_peak(s, v)
+        if text:
+            self.format_active()
+
+    def _new_peak(self, s, v):
+        for i in self.of_src[s]:
+            m = v * self.mult[i]
+            self.maxima[i] = m
+            if self.active[i]:
+                self.max_text[i][0] = self.fmts[i].format(m)
+
+    def format_active(self):
+        fmts = self.fmts
+        text = self.text
+        values = self.values
+        for i in self.active_ids:
+            text[i][0] = fmts[i].format(values[i])
+
+    def reset_max(self):
+        for s in range(len(self.peak)):
+            self.peak[s] = 0.0
+        for i in range(self.count):
+            self.maxima[i] = 0.0
+            self.max_text[i][0] = self.fmts[i].format(0)
@@ -0,0 +1,191 @@
+##
+# @module    corners
+# @brief     Streaming corner detection with per-corner stats matched across laps
+# @version   1.0
+##
+
+# update() runs once per sample and only does constant work:
+#   straight  waits for |lateral G| to reach `enter_g`, tracking the peak
+#             braking G since the last corner (braking is done before turn in)
+#   corner    tracks min speed (and where it happened), peak lateral G and
+#             braking; ends when |lateral G| drops below `exit_g` or the
+#             direction flips hard (chicanes), and is kept if it lasted
+#             `min_s` or longer; a shorter one (a kerb, a lane change) counts
+#             as straight and leaves the braking peak to the next corner
+# A kept corner is matched to a known corner by the position of its min
+# speed: the nearest one turning the same way within `match_m`, else it's
+# new. That search runs once per corner, over at most `max_corners`.
+# Corners are numbered in the order first driven, so corner 0 is the
+# start/finish gate: a lap starts there, or at any corner already recorded
+# on the current lap when corner 0 was missed. Corners first found late in
+# the session (a new line, a corner that only now passed enter_g) just join
+# the current lap. A corner that matches the one just recorded after less
+# than `min_s` of straight is the same corner split in two (G dipped below
+# exit_g mid-corner) and is merged into it.
+#
+# Stats live in one array('f') of max_corners * laps * FIELDS, the last
+# `laps` laps per corner, so memory is fixed however long the session.
+
+from array import array
+from micropython import const
+
+ENTRY_SPEED = const(0)
+MIN_SPEED = const(1)
+EXIT_SPEED = const(2)
+PEAK_LAT = const(3)
+PEAK_BRAKE = const(4)
+DURATION = const(5)
+FIELDS = const(6)
+
+
+class Corner_Segmenter:
+
+    def __init__(self, rate_hz, enter_g=0.4, exit_g=0.25, min_s=1.0, match_m=30.0, max_corners=32, laps=4):
+        """
+        Args:
+            rate_hz (float): sample rate, converts sample counts to seconds
+            enter_g (float): |lateral G| that starts a corner
+            exit_g (float): |lateral G| below which a corner ends, less than enter_g
+            min_s (float): shorter corners are ignored (kerbs, lane changes)
+            match_m (float): furthest a corner's min speed point can be from a known corner's and match
+            max_corners (int): corners tracked per lap, later new ones aren't recorded
+            laps (int): laps kept per corner
+        """
+        self.period = 1.0 / rate_hz
+        self.enter_g = enter_g
+        self.exit_g = exit_g
+        self.min_samples = int(min_s * rate_hz)
+        self.match_sq = match_m * match_m
+        self.max_corners = max_corners
+        self.laps = laps
+        self.stats = array('f', [0.0] * (max_corners * laps * FIELDS))
+        # lap each slot was last written on, -1 for never
+        self.slot_lap = array('h', [-1] * (max_corners * laps))
+        self.apex_x = array('f', [0.0] * max_corners)
+        self.apex_y = array('f', [0.0] * max_corners)
+        self.turn = array('b', [0] * max_corners)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.slot_lap)):
+            self.slot_lap[i] = -1
+        self.known = 0
+        self.lap = 0
+        self.last_id = -1
+        self.last_lap = -1
+        self.in_corner = False
+        self.brake = 0.0
+        self.skipped = 0
+        self.straight = 0
+        self.gap = 0
+
+    def update(self, speed, lat_g, long_g, east, north):
+        """Feeds one sample. Returns True when a corner has just been recorded (see last_id/last_lap)."""
+        brake = -long_g
+        if brake > self.brake:
+            self.brake = brake
+        alat = -lat_g if lat_g < 0 else lat_g
+        if not self.in_corner:
+            self.straight += 1
+            if alat >= self.enter_g:
+                self._start(speed, lat_g, east, north)
+            return False
+        if alat < self.exit_g or (alat >= self.enter_g and (lat_g > 0) != (self.dir > 0)):
+            recorded = self._finish(speed)
+            if alat >= self.enter_g:
+                self._start(speed, lat_g, east, north)
+            return recorded
+        self.samples += 1
+        if speed < self.min_speed:
+            self.min_speed = speed
+            self.min_x = east
+            self.min_y = north
+        if alat > self.peak_lat:
+            self.peak_lat = alat
+        return False
+
+    def _start(self, speed, lat_g, east, north):
+        self.in_corner = True
+        self.dir = 1 if lat_g > 0 else -1
+        # straight samples between the last corner and this one
+        self.gap = self.straight
+        self.straight = 0
+        self.samples = 1
+        self.entry_speed = speed
+        self.min_speed = speed
+        self.min_x = east
+        self.min_y = north
+        self.peak_lat = -lat_g if lat_g < 0 else lat_g
+
+    def _finish(self, speed):
+        self.in_corner = False
+        if self.samples < self.min_samples:
+            # a kerb or lane change blip, not a corner: it's part of the
+            # straight, and the braking so far belongs to the next corner
+            self.straight = self.gap + self.samples
+            return False
+        cid = self._match()
+        if cid < 0:
+            self.skipped += 1
+            return False
+        brake = self.brake
+        self.brake = 0.0
+        s = self.stats
+        if cid == self.last_id and self.gap < self.min_samples:
+            base = (cid * self.laps + self.lap % self.laps) * FIELDS
+            if self.min_speed < s[base + MIN_SPEED]:
+                s[base + MIN_SPEED] = self.min_speed
+            s[base + EXIT_SPEED] = speed
+            if self.peak_lat > s[base + PEAK_LAT]:
+                s[base + PEAK_LAT] = self.peak_lat
+            if brake > s[base + PEAK_BRAKE]:
+                s[base + PEAK_BRAKE] = brake
+            s[base + DURATION] += self.samples * self.period
+            return True
+        if self.last_id >= 0 and (cid == 0 or self.slot_lap[cid * self.laps + self.lap % self.laps] == self.lap):
+            self.lap += 1
+        self.last_id = cid
+        self.last_lap = self.lap
+        slot = cid * self.laps + self.lap % self.laps
+        self.slot_lap[slot] = self.lap
+        base = slot * FIELDS
+        s[base + ENTRY_SPEED] = self.entry_speed
+        s[base + MIN_SPEED] = self.min_speed
+        s[base + EXIT_SPEED] = speed
+        s[base + PEAK_LAT] = self.peak_lat
+        s[base + PEAK_BRAKE] = brake
+        s[base + DURATION] = self.samples * self.period
+        return True
+
+    def _match(self):
+        best = -1
+        best_d = self.match_sq
+        for i in range(self.known):
+            if self.turn[i] != self.dir:
+                continue
+            dx = self.apex_x[i] - self.min_x
+            dy = self.apex_y[i] - self.min_y
+            d = dx * dx + dy * dy
+            if d <= best_d:
+                best = i
+                best_d = d
+        if best >= 0 or self.known == self.max_corners:
+            return best
+        best = self.known
+        self.apex_x[best] = self.min_x
+        self.apex_y[best] = self.min_y
+        self.turn[best] = self.dir
+        self.known += 1
+        return best
+
+    def get(self, cid, lap, field):
+        """A stat of corner `cid` on `lap`, None if that lap isn't held."""
+        slot = cid * self.laps + lap % self.laps
+        if self.slot_lap[slot] != lap:
+            return None
+        return self.stats[slot * FIELDS + field]
+
+    def laps_of(self, cid):
+        """Laps held for corner `cid`, oldest first."""
+        base = cid * self.laps
+        return sorted(self.slot_lap[base + i] for i in range(self.laps) if self.slot_lap[base + i] >= 0)
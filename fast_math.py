@@ -0,0 +1,117 @@
+##
+# @module    fast_math
+# @brief     Table based vector magnitude and direction with bounded error
+# @version   1.0
+##
+
+# Both functions fold the vector into the first octant, so the ratio r of
+# the smaller to the larger component is in [0, 1], and look r up in a
+# table with linear interpolation:
+#   hypot      max(|x|, |y|) * sqrt(1 + r^2)
+#   atan2_deg  atan(r) unfolded back to its octant
+# Interpolation error is at most h^2/8 times the largest second derivative
+# on the table, with h = 1/TABLE_STEPS. Both second derivatives are below 1
+# on [0, 1], so with 256 steps the relative magnitude error is under 2e-6
+# and the angle error under 2e-6 rad (1e-4 degrees), well below the
+# resolution shown. benchmark() measures the real error and cost against
+# math on whatever it runs on.
+
+import math
+from array import array
+from micropython import const
+
+TABLE_STEPS = const(256)
+_DEG = 180.0 / math.pi
+
+# sqrt(1 + r^2) and atan(r) in degrees for r = i / TABLE_STEPS
+_SQRT = array('f', [math.sqrt(1.0 + (i / TABLE_STEPS) ** 2) for i in range(TABLE_STEPS + 1)])
+_ATAN = array('f', [math.atan(i / TABLE_STEPS) * _DEG for i in range(TABLE_STEPS + 1)])
+
+
+def _lookup(table, r):
+    f = r * TABLE_STEPS
+    i = int(f)
+    if i >= TABLE_STEPS:
+        return table[TABLE_STEPS]
+    a = table[i]
+    return a + (table[i + 1] - a) * (f - i)
+
+
+def hypot(x, y):
+    """Length of (x, y)."""
+    if x < 0:
+        x = -x
+    if y < 0:
+        y = -y
+    if x < y:
+        x, y = y, x
+    if x == 0:
+        return 0.0
+    return x * _lookup(_SQRT, y / x)
+
+
+def atan2_deg(y, x):
+    """Angle of (x, y) from the +x axis in degrees, -180 to 180."""
+    ax = -x if x < 0 else x
+    ay = -y if y < 0 else y
+    if ax == 0 and ay == 0:
+        return 0.0
+    if ay <= ax:
+        a = _lookup(_ATAN, ay / ax)
+    else:
+        a = 90.0 - _lookup(_ATAN, ax / ay)
+    if x < 0:
+        a = 180.0 - a
+    return -a if y < 0 else a
+
+
+def benchmark(n=2000, magnitude=20.0):
+    """Max errors and us per call of the tables against math on `n` vectors round a circle.
+
+    Returns (max relative hypot error, max atan2 error in degrees,
+    table us per call, math us per call), and prints them.
+    """
+    try:
+        from utime import ticks_us, ticks_diff
+    except ImportError:
+        from time import perf_counter
+
+        def ticks_us():
+            return int(perf_counter() * 1000000)
+
+        def ticks_diff(a, b):
+            return a - b
+    xs = array('f', [magnitude * math.cos(i * 2.39996) * (0.05 + (i % 19) / 19.0) for i in range(n)])
+    ys = array('f', [magnitude * math.sin(i * 2.39996) * (0.05 + (i % 19) / 19.0) for i in range(n)])
+    mag_err = 0.0
+    ang_err = 0.0
+    for i in range(n):
+        x = xs[i]
+        y = ys[i]
+        exact = math.sqrt(x * x + y * y)
+        e = abs(hypot(x, y) - exact) / exact
+        if e > mag_err:
+            mag_err = e
+        e = abs(atan2_deg(y, x) - math.atan2(y, x) * _DEG)
+        if e > 180.0:
+            e = 360.0 - e
+        if e > ang_err:
+            ang_err = e
+
+    start = ticks_us()
+    for i in range(n):
+        hypot(xs[i], ys[i])
+        atan2_deg(ys[i], xs[i])
+    table_us = ticks_diff(ticks_us(), start) / n
+    sqrt = math.sqrt
+    atan2 = math.atan2
+    start = ticks_us()
+    for i in range(n):
+        x = xs[i]
+        y = ys[i]
+        sqrt(x * x + y * y)
+        atan2(y, x) * _DEG
+    math_us = ticks_diff(ticks_us(), start) / n
+    print('hypot max rel error {:.2e}  atan2 max error {:.2e} deg  table {:.2f} us  math {:.2f} us per vector'.format(
+        mag_err, ang_err, table_us, math_us))
+    return mag_err, ang_err, table_us, math_us
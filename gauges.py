@@ -0,0 +1,206 @@
+##
+# @module    gauges
+# @brief     Bar and needle gauges animated in place through gui.redraw()
+# @version   1.0
+##
+
+# The gauges' moving parts are display list words inside lists that stay
+# in the page's gui list, the same way one element text lists do for
+# values, so update() changes a word or two and the next gui.redraw()
+# shows it; no gui.show of a rebuilt page.
+#   Bar_Gauge    the fill (solid, or banded into a gradient) is drawn full
+#                length once and clipped to the value by a scissor, so an
+#                update rewrites the SCISSOR_XY/SIZE pair. Both are small
+#                ints, so it doesn't allocate.
+#   Needle_Gauge the tip vertex of every position is precomputed, an
+#                update picks one from the table.
+
+import gui
+import math
+
+_LEFT = 0
+_SPAN = 1
+
+
+def _mix(a, b, t):
+    return gui.RGB(
+        int(((a >> 16) & 255) + (((b >> 16) & 255) - ((a >> 16) & 255)) * t),
+        int(((a >> 8) & 255) + (((b >> 8) & 255) - ((a >> 8) & 255)) * t),
+        int((a & 255) + ((b & 255) - (a & 255)) * t))
+
+
+def gradient(stops, bands):
+    """`bands` RGB colours interpolated evenly through the RGB `stops`."""
+    if len(stops) == 1 or bands == 1:
+        return [stops[0]] * bands
+    out = []
+    for i in range(bands):
+        pos = i / (bands - 1) * (len(stops) - 1)
+        k = min(int(pos), len(stops) - 2)
+        out.append(_mix(stops[k], stops[k + 1], pos - k))
+    return out
+
+
+class Bar_Gauge:
+
+    def __init__(self, x, y, width, height, lo, hi, colours, zero=0.0, bands=12, vertical=False,
+                 outline=gui.RGB(0, 0, 0)):
+        """
+        Args:
+            x, y (int): top left corner
+            width, height (int): gauge size in pixels
+            lo, hi (float): values at the left/bottom and right/top ends
+            colours (tuple): RGB fill, one colour for solid or gradient stops from `zero` out to the ends
+            zero (float): value the bar grows from, e.g. 0 for a centred G bar
+            bands (int): gradient bands between zero and each end, more is smoother but costs 3 words each
+            vertical (bool): grow up/down instead of left/right
+            outline (int): RGB of the frame and zero line
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.lo = lo
+        self.vertical = vertical
+        self.length = height if vertical else width
+        self.scale = self.length / (hi - lo)
+        self.zero_px = self._px(zero)
+        self.outline = outline
+        self.colours = colours
+        self.bands = 1 if len(colours) == 1 else bands
+        self.pos = -1
+        self.clip = [gui.DL_SCISSOR_XY(x, y), gui.DL_SCISSOR_SIZE(0, 0)]
+        self.update(zero)
+
+    def _px(self, value):
+        px = int((value - self.lo) * self.scale)
+        if px < 0:
+            return 0
+        if px > self.length:
+            return self.length
+        return px
+
+    def _fill(self):
+        """Gradient rectangles out from the zero point to both ends."""
+        colours = gradient(self.colours, self.bands)
+        words = []
+        for start, end in ((self.zero_px, self.length), (self.zero_px, 0)):
+            span = end - start
+            if not span:
+                continue
+            for i in range(self.bands):
+                a = start + span * i // self.bands
+                b = start + span * (i + 1) // self.bands
+                words.append(gui.DL_COLOR(colours[i]))
+                if self.vertical:
+                    words.append(gui.DL_VERTEX2F(self.x, self.y + self.height - max(a, b)))
+                    words.append(gui.DL_VERTEX2F(self.x + self.width, self.y + self.height - min(a, b)))
+                else:
+                    words.append(gui.DL_VERTEX2F(self.x + min(a, b), self.y))
+                    words.append(gui.DL_VERTEX2F(self.x + max(a, b), self.y + self.height))
+        return words
+
+    def __call__(self):
+        x = self.x
+        y = self.y
+        if self.vertical:
+            zero_line = [gui.DL_VERTEX2F(x - 4, y + self.height - self.zero_px),
+                         gui.DL_VERTEX2F(x + self.width + 4, y + self.height - self.zero_px)]
+        else:
+            zero_line = [gui.DL_VERTEX2F(x + self.zero_px, y - 4),
+                         gui.DL_VERTEX2F(x + self.zero_px, y + self.height + 4)]
+        return [
+            [gui.DL_SAVE_CONTEXT()],
+            self.clip,
+            [gui.PRIM_RECTS, self._fill()],
+            [gui.DL_RESTORE_CONTEXT()],
+            [gui.DL_COLOR(self.outline)],
+            [gui.PRIM_LINE_STRIP, [
+                gui.DL_LINE_WIDTH(1),
+                gui.DL_VERTEX2F(x, y),
+                gui.DL_VERTEX2F(x + self.width, y),
+                gui.DL_VERTEX2F(x + self.width, y + self.height),
+                gui.DL_VERTEX2F(x, y + self.height),
+                gui.DL_VERTEX2F(x, y),
+            ]],
+            [gui.PRIM_LINES, [gui.DL_LINE_WIDTH(1.5)] + zero_line],
+        ]
+
+    def update(self, value):
+        pos = self._px(value)
+        if pos == self.pos:
+            return
+        self.pos = pos
+        a = pos if pos < self.zero_px else self.zero_px
+        size = pos - self.zero_px if pos > self.zero_px else self.zero_px - pos
+        if self.vertical:
+            self.clip[_LEFT] = gui.DL_SCISSOR_XY(self.x, self.y + self.height - a - size)
+            self.clip[_SPAN] = gui.DL_SCISSOR_SIZE(self.width, size)
+        else:
+            self.clip[_LEFT] = gui.DL_SCISSOR_XY(self.x + a, self.y)
+            self.clip[_SPAN] = gui.DL_SCISSOR_SIZE(size, self.height)
+
+
+class Needle_Gauge:
+
+    def __init__(self, cx, cy, radius, lo, hi, start_deg=180.0, sweep_deg=-180.0, steps=180,
+                 colour=gui.RGB(200, 0, 0), dial=gui.RGB(0, 0, 0), ticks=5):
+        """
+        Args:
+            cx, cy (int): pivot position
+            radius (int): needle length in pixels
+            lo, hi (float): values at the start and end of the sweep
+            start_deg (float): needle angle at `lo`, counterclockwise from 3 o'clock
+            sweep_deg (float): angle from `lo` to `hi`, negative sweeps clockwise
+            steps (int): needle positions, each one a precomputed vertex word
+            colour (int): RGB of the needle
+            dial (int): RGB of the arc and ticks
+            ticks (int): tick marks including both ends
+        """
+        self.cx = cx
+        self.cy = cy
+        self.radius = radius
+        self.lo = lo
+        self.scale = steps / (hi - lo)
+        self.steps = steps
+        self.start = start_deg
+        self.sweep = sweep_deg
+        self.colour = colour
+        self.dial = dial
+        self.ticks = ticks
+        self.tips = tuple(self._point(i / steps, radius) for i in range(steps + 1))
+        self.pos = 0
+        self.needle = [gui.DL_LINE_WIDTH(4), gui.DL_VERTEX2F(cx, cy), self.tips[0]]
+
+    def _point(self, t, r):
+        a = math.radians(self.start + self.sweep * t)
+        return gui.DL_VERTEX2F(self.cx + r * math.cos(a), self.cy - r * math.sin(a))
+
+    def __call__(self):
+        arc = [gui.DL_LINE_WIDTH(2)]
+        for i in range(33):
+            arc.append(self._point(i / 32, self.radius + 8))
+        ticks = [gui.DL_LINE_WIDTH(2)]
+        for i in range(self.ticks):
+            t = i / (self.ticks - 1)
+            ticks.append(self._point(t, self.radius + 8))
+            ticks.append(self._point(t, self.radius + 20))
+        return [
+            [gui.DL_COLOR(self.dial)],
+            [gui.PRIM_LINE_STRIP, arc],
+            [gui.PRIM_LINES, ticks],
+            [gui.DL_COLOR(self.colour)],
+            [gui.PRIM_LINES, self.needle],
+            # a zero size rectangle drawn with a wide line is a dot over the pivot
+            [gui.PRIM_RECTS, [gui.DL_LINE_WIDTH(6), gui.DL_VERTEX2F(self.cx, self.cy), gui.DL_VERTEX2F(self.cx, self.cy)]],
+        ]
+
+    def update(self, value):
+        pos = int((value - self.lo) * self.scale)
+        if pos < 0:
+            pos = 0
+        elif pos > self.steps:
+            pos = self.steps
+        if pos != self.pos:
+            self.pos = pos
+            self.needle[2] = self.tips[pos]
@@ -0,0 +1,4 @@
+##
+# @module    host
+# @brief     Host-side (desktop Python) tools for GForceDisplay recordings
+##
@@ -0,0 +1,120 @@
+##
+# @module    host.alloc_check
+# @brief     Host equivalent of alloc_profile using tracemalloc
+##
+
+# Runs the app on the stand-ins until it reaches steady state (every page
+# visited and cached, logging on), then measures the sample callback, the
+# vsync callback and cached page switches with tracemalloc. Two things fail
+# the check:
+#   retained  memory still held after all the calls, i.e. buffers or caches
+#             growing per call (--budget, in total)
+#   peak      the most any one call allocated at once, i.e. the garbage
+#             each call leaves for the GC (PEAK_BUDGETS, per call)
+# CPython allocates temporaries the device wouldn't (boxed floats), so the
+# per call budgets are host figures with headroom over those, meant to
+# catch a new per-call allocation rather than to predict device bytes.
+# Tracing starts before the warm up, which runs for longer than the strip
+# chart window, so words replaced in preallocated display lists were
+# allocated under tracing and don't show up as growth.
+#
+#   python -m host.alloc_check [--calls N] [--budget BYTES]
+# Exits 1 when any callback retains more than the budget or goes over its
+# per call budget.
+
+import argparse
+import sys
+import tracemalloc
+
+from host import harness
+
+SAMPLE_US = 50000
+FRAME_US = 16667
+# bytes one call may allocate at its peak, about 1.5x what each needs today
+PEAK_BUDGETS = {
+    # copying a sample into the ring, CPython boxes each float it moves
+    'gnss_callback': 640,
+    # draining the ring plus the value and sats text of the page, formatted once per frame
+    'vsync_cb': 2048,
+    # cached pages, only the gui list handed to gui.show changes
+    'page switch': 256,
+}
+
+
+def _measure(name, fn, calls):
+    fn()  # let lazy state settle before the baseline
+    before, _ = tracemalloc.get_traced_memory()
+    peak = 0
+    for _ in range(calls):
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, top = tracemalloc.get_traced_memory()
+        if top - start > peak:
+            peak = top - start
+    after, _ = tracemalloc.get_traced_memory()
+    return {
+        'name': name,
+        'calls': calls,
+        'retained': after - before,
+        'peak': peak,
+    }
+
+
+def run(calls=2000, warmup=1600):
+    app = harness.load_app()
+    tracemalloc.start()
+    app.toggle_logging(None)
+    samples = list(harness.synthetic(warmup + 2 * calls + 10))
+    it = iter(samples)
+
+    def sample():
+        harness.advance_clock(SAMPLE_US)
+        harness.feed(**next(it))
+
+    def frame():
+        harness.advance_clock(FRAME_US)
+        harness.vsync()
+
+    for name in app.pages.order + ['main']:
+        app.pages.show(name)
+        for _ in range(warmup // 4):
+            sample()
+            frame()
+
+    names = [n for n in app.pages.order]
+    switches = iter(range(10 ** 9))
+
+    def switch():
+        app.pages.show(names[next(switches) % len(names)])
+
+    try:
+        results = [
+            _measure('gnss_callback', sample, calls),
+            _measure('vsync_cb', frame, calls),
+            _measure('page switch', switch, calls // 10),
+        ]
+    finally:
+        tracemalloc.stop()
+        app.toggle_logging(None)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m host.alloc_check')
+    parser.add_argument('--calls', type=int, default=2000, help='calls measured per callback')
+    parser.add_argument('--budget', type=int, default=1024, help='bytes a callback may retain in total')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for r in run(args.calls):
+        peak_budget = PEAK_BUDGETS[r['name']]
+        bad = r['retained'] > args.budget or r['peak'] > peak_budget
+        failed |= bad
+        print('{:<14} calls {:>6}  retained {:>7} B  peak {:>5}/{:<5} B per call  {}'.format(
+            r['name'], r['calls'], r['retained'], r['peak'], peak_budget, 'FAIL' if bad else 'ok'))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,9 @@
+##
+# @module    host.analysis
+# @brief     Vectorised analysis of .vbo and app session (.gfl) logs
+##
+
+# Requires NumPy. Run `python -m host.analysis --help` from the repo root.
+
+from .loaders import load, load_vbo, load_gfl
+from .stats import summarise, summarise_file
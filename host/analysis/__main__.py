@@ -0,0 +1,94 @@
+##
+# @module    host.analysis.__main__
+# @brief     Command line summary of a directory or list of recordings
+##
+
+# Examples:
+#   python -m host.analysis /media/sd/*.vbo
+#   python -m host.analysis --gate 52.0695,-1.0221,15 --json day.json logs/
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .stats import PERCENTILES, summarise_file
+
+EXTENSIONS = ('.vbo', '.gfl')
+
+
+def _expand(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(EXTENSIONS)
+            ))
+        else:
+            files.append(path)
+    return files
+
+
+def _gate(text):
+    try:
+        lat, lon, radius = (float(v) for v in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected LAT,LON,RADIUS_M')
+    return lat, lon, radius
+
+
+def _print_table(results, percentile):
+    key = 'p{}_combined_g'.format(percentile)
+    print('{:<28} {:>5} {:>8} {:>7} {:>6} {:>6} {:>6} {:>7}'.format(
+        'file', 'laps', 'time(s)', 'km/h', 'lat', 'brake', 'accel', 'p{} G'.format(percentile)))
+    for r in results:
+        if 'error' in r:
+            print('{:<28} error: {}'.format(r['file'][:28], r['error']))
+            continue
+        if 'samples' not in r:
+            print('{:<28} empty'.format(r['file'][:28]))
+            continue
+        print('{:<28} {:>5} {:>8.0f} {:>7.1f} {:>6.2f} {:>6.2f} {:>6.2f} {:>7.2f}'.format(
+            r['file'][:28], len(r['laps']), r['duration_s'], r['max_speed_kmh'],
+            r['max_lat_g'], r['max_brake_g'], r['max_accel_g'], r[key]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m host.analysis', description='Summarise .vbo and session log recordings')
+    parser.add_argument('paths', nargs='+', help='.vbo/.gfl files or directories containing them')
+    parser.add_argument('--gate', type=_gate, help='start/finish as LAT,LON,RADIUS_M to split laps')
+    parser.add_argument('--percentiles', type=lambda s: tuple(int(p) for p in s.split(',')),
+                        default=PERCENTILES, help='comma separated, default %(default)s')
+    parser.add_argument('--traces', action='store_true', help='include 1 Hz speed traces in the json')
+    parser.add_argument('--json', help='write full results to this file ("-" for stdout)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    args = parser.parse_args(argv)
+
+    files = _expand(args.paths)
+    if not files:
+        parser.error('no recordings found')
+    started = time.perf_counter()
+    work = partial(summarise_file, gate=args.gate, percentiles=args.percentiles, traces=args.traces)
+    if args.jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(files))) as pool:
+            results = list(pool.map(work, files))
+    else:
+        results = [work(f) for f in files]
+    elapsed = time.perf_counter() - started
+
+    if args.json == '-':
+        json.dump(results, sys.stdout, indent=1)
+        return 0
+    _print_table(results, args.percentiles[-1])
+    print('{} files in {:.2f} s'.format(len(files), elapsed), file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
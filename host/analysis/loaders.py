@@ -0,0 +1,146 @@
+##
+# @module    host.analysis.loaders
+# @brief     Memory-mapped loaders returning NumPy column arrays
+##
+
+# Every loader returns a dict of equal length float64 arrays:
+#   time     - seconds since the start of the file
+#   speed    - ground speed in m/s
+#   lat_g    - lateral acceleration in g
+#   long_g   - longitudinal acceleration in g
+#   lat, lon - position in degrees (only when the file has position)
+
+import mmap
+import struct
+import zlib
+
+import numpy as np
+
+from vbo_reader import VBO_Reader, ALIASES
+
+G = 9.80665
+
+# ustruct codes used by session_log mapped to NumPy dtypes
+GFL_DTYPES = {
+    'b': 'i1', 'B': 'u1', 'h': '<i2', 'H': '<u2',
+    'i': '<i4', 'I': '<u4', 'l': '<i4', 'L': '<u4', 'f': '<f4', 'd': '<f8',
+}
+GFL_HEADER_FMT = '<4sHHHB'
+GFL_BLOCK_DTYPE = np.dtype([
+    ('magic', 'S4'), ('seq', '<u4'), ('count', '<u2'),
+    ('rec_size', '<u2'), ('dropped', '<u4'), ('crc', '<u4'),
+])
+
+
+def _map(path):
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _smooth(x, n=5):
+    if len(x) < n:
+        return x
+    return np.convolve(x, np.ones(n) / n, mode='same')
+
+
+def _derive_accel(time, speed, heading):
+    """Lateral/longitudinal g from speed and heading for files without accel channels."""
+    dt = np.gradient(time)
+    dt[dt <= 0] = np.nan
+    long_g = np.gradient(speed) / dt / G
+    yaw_rate = np.gradient(np.unwrap(np.radians(heading))) / dt
+    lat_g = speed * yaw_rate / G
+    return _smooth(np.nan_to_num(lat_g)), _smooth(np.nan_to_num(long_g))
+
+
+def load_vbo(path):
+    """Loads a .vbo, parsing only the columns used straight from the mapped file.
+
+    The header, data offset and torn row handling come from vbo_reader's
+    index (cached as <name>.vbi), and rows are streamed into np.loadtxt one
+    line at a time, so the text is never copied whole.
+    """
+    reader = VBO_Reader(path)
+    names = reader.names
+    index = {}
+    for key in ALIASES:
+        name = reader.find(key)
+        if name is not None:
+            index[key] = names.index(name)
+    for key in ('time', 'speed'):
+        if key not in index:
+            raise ValueError('{}: no {} channel'.format(path, key))
+    cols = sorted(set(index.values()))
+    ncols = len(names)
+    mm = _map(path)
+    try:
+        mm.seek(reader.data_offset)
+        # A log cut short by power loss can end in a partial row
+        lines = (line.decode('ascii', 'ignore') for line in iter(mm.readline, b'') if len(line.split()) >= ncols)
+        table = np.loadtxt(lines, usecols=cols, ndmin=2).reshape(-1, len(cols))
+    finally:
+        mm.close()
+
+    rows = len(table)
+    # table only holds `cols`, point the keys at their position in it
+    index = {key: cols.index(c) for key, c in index.items()}
+    hhmmss = table[:, index['time']]
+    secs = (hhmmss // 10000) * 3600 + (hhmmss // 100 % 100) * 60 + hhmmss % 100
+    secs = secs + 86400 * np.cumsum(np.diff(secs, prepend=secs[:1]) < -43200)  # midnight wrap
+    out = {
+        'time': secs - secs[0] if rows else secs,
+        'speed': table[:, index['speed']] / 3.6,
+    }
+    if 'lat' in index and 'lon' in index:
+        out['lat'] = table[:, index['lat']] / 60.0
+        out['lon'] = -table[:, index['lon']] / 60.0  # .vbo longitude is positive west
+    if 'lat_g' in index and 'long_g' in index:
+        out['lat_g'] = table[:, index['lat_g']]
+        out['long_g'] = table[:, index['long_g']]
+    elif 'heading' in index:
+        out['lat_g'], out['long_g'] = _derive_accel(out['time'], out['speed'], table[:, index['heading']])
+    else:
+        raise ValueError('{}: no acceleration or heading channel'.format(path))
+    return out
+
+
+def load_gfl(path):
+    """Loads a session_log file, skipping blocks whose crc doesn't match."""
+    mm = _map(path)
+    blocks = None
+    try:
+        magic, version, block_size, rec_size, fmt_len = struct.unpack_from(GFL_HEADER_FMT, mm, 0)
+        if magic != b'GFLH':
+            raise ValueError('{}: not a session log'.format(path))
+        pos = struct.calcsize(GFL_HEADER_FMT)
+        fmt = mm[pos:pos + fmt_len].decode()
+        names = mm[pos + fmt_len:block_size].rstrip(b'\0').decode().split(',')
+        dtype = np.dtype([(n, GFL_DTYPES[c]) for n, c in zip(names, fmt.lstrip('<'))])
+        nblocks = len(mm) // block_size - 1
+        blocks = np.frombuffer(mm, np.uint8, nblocks * block_size, block_size).reshape(nblocks, block_size)
+        headers = blocks[:, :GFL_BLOCK_DTYPE.itemsize].copy().view(GFL_BLOCK_DTYPE)[:, 0]
+        hdr = GFL_BLOCK_DTYPE.itemsize
+        crc_ok = np.fromiter((zlib.crc32(b[hdr:]) for b in blocks), np.uint32, nblocks)
+        valid = (headers['magic'] == b'GFLB') & (headers['crc'] == crc_ok)
+        per_block = (block_size - hdr) // rec_size
+        payload = blocks[valid, hdr:hdr + per_block * rec_size].copy()
+        records = payload.view(dtype).reshape(-1, per_block)
+        keep = np.arange(per_block) < headers['count'][valid][:, None]
+        records = records[keep]
+    finally:
+        blocks = None  # release the view before closing the map
+        mm.close()
+
+    time = records['time_ms'].astype(np.float64) / 1000.0
+    return {
+        'time': time - time[0] if len(time) else time,
+        'speed': records['speed_mps'].astype(np.float64),
+        'lat_g': records['lat_acc_mps2'].astype(np.float64) / G,
+        'long_g': records['long_acc_mps2'].astype(np.float64) / G,
+    }
+
+
+def load(path):
+    if str(path).lower().endswith('.gfl'):
+        return load_gfl(path)
+    return load_vbo(path)
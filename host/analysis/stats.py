@@ -0,0 +1,103 @@
+##
+# @module    host.analysis.stats
+# @brief     Per-session and per-lap summaries computed on whole columns
+##
+
+import os
+
+import numpy as np
+
+from .loaders import load
+
+EARTH_RADIUS_M = 6371000.0
+PERCENTILES = (50, 90, 99)
+ENVELOPE_SECTORS = 36
+TRACE_HZ = 1.0
+
+
+def lap_bounds(data, gate):
+    """Sample indices where each lap starts.
+
+    Args:
+        gate (tuple): (lat, lon, radius_m), a lap starts on every entry into the circle
+    """
+    if gate is None or 'lat' not in data:
+        return np.array([0], dtype=np.intp)
+    lat0, lon0, radius = gate
+    lat = np.radians(data['lat'])
+    dx = np.radians(data['lon'] - lon0) * np.cos(np.radians(lat0)) * EARTH_RADIUS_M
+    dy = (lat - np.radians(lat0)) * EARTH_RADIUS_M
+    inside = np.hypot(dx, dy) < radius
+    entries = np.flatnonzero(inside[1:] & ~inside[:-1]) + 1
+    return np.concatenate(([0], entries))
+
+
+def friction_envelope(lat_g, long_g, sectors=ENVELOPE_SECTORS):
+    """Peak combined g in each direction sector, sector 0 starts at full braking."""
+    angle = np.arctan2(long_g, lat_g)
+    idx = ((angle + np.pi) * (sectors / (2 * np.pi))).astype(np.intp) % sectors
+    env = np.zeros(sectors)
+    np.maximum.at(env, idx, np.hypot(lat_g, long_g))
+    return env
+
+
+def speed_trace(time, speed, hz=TRACE_HZ):
+    if len(time) < 2:
+        return speed.copy()
+    grid = np.arange(time[0], time[-1], 1.0 / hz)
+    return np.interp(grid, time, speed)
+
+
+def _channel_stats(data, sl, percentiles):
+    lat = np.abs(data['lat_g'][sl])
+    lng = data['long_g'][sl]
+    comb = np.hypot(lat, lng)
+    if not len(lat):
+        return None
+    pct = np.percentile(np.stack((lat, np.abs(lng), comb)), percentiles, axis=1)
+    out = {
+        'duration_s': float(data['time'][sl][-1] - data['time'][sl][0]),
+        'samples': int(len(lat)),
+        'max_speed_kmh': float(data['speed'][sl].max() * 3.6),
+        'max_lat_g': float(lat.max()),
+        'max_accel_g': float(lng.max()),
+        'max_brake_g': float(-lng.min()),
+        'max_combined_g': float(comb.max()),
+    }
+    for i, p in enumerate(percentiles):
+        out['p{}_lat_g'.format(p)] = float(pct[i, 0])
+        out['p{}_long_g'.format(p)] = float(pct[i, 1])
+        out['p{}_combined_g'.format(p)] = float(pct[i, 2])
+    return out
+
+
+def summarise(data, gate=None, percentiles=PERCENTILES, traces=False):
+    summary = _channel_stats(data, slice(None), percentiles) or {}
+    summary['envelope_g'] = friction_envelope(data['lat_g'], data['long_g']).round(3).tolist()
+    if traces:
+        summary['speed_trace_kmh'] = (speed_trace(data['time'], data['speed']) * 3.6).round(1).tolist()
+
+    starts = lap_bounds(data, gate)
+    laps = []
+    # A lap runs from one gate entry to the next: the part before the first
+    # is the out lap and the part after the last the in lap, neither counts
+    for start, end in zip(starts[1:-1], starts[2:]):
+        lap = _channel_stats(data, slice(start, end), percentiles)
+        if lap is None:
+            continue
+        lap['envelope_g'] = friction_envelope(data['lat_g'][start:end], data['long_g'][start:end]).round(3).tolist()
+        if traces:
+            lap['speed_trace_kmh'] = (speed_trace(data['time'][start:end], data['speed'][start:end]) * 3.6).round(1).tolist()
+        laps.append(lap)
+    summary['laps'] = laps
+    return summary
+
+
+def summarise_file(path, gate=None, percentiles=PERCENTILES, traces=False):
+    """Process pool entry point, returns a small picklable dict."""
+    try:
+        summary = summarise(load(path), gate, percentiles, traces)
+    except (ValueError, KeyError, OSError) as e:
+        return {'file': os.path.basename(path), 'error': str(e)}
+    summary['file'] = os.path.basename(path)
+    return summary
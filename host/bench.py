@@ -0,0 +1,250 @@
+##
+# @module    host.bench
+# @brief     End-to-end sample-to-pixel benchmark on the host stand-ins
+##
+
+# Plays samples through the app at each GNSS rate and page, with vsync
+# frames interleaved at 60 Hz on the harness clock:
+#   sample  gnss_callback, copying the sample into the handoff ring
+#   frame   vsync_cb: process_samples (channels, set_max_values, charts,
+#           LEDs, logging), status, log flush and gui.redraw walking the
+#           display list
+#   latency arrival of a sample to the end of the first frame drawn after
+#           it: time waiting for vsync plus the callback and frame CPU time
+#   load    CPU time spent in callbacks and frames per second of samples,
+#           so 1 - load is the headroom left at that rate on the host
+#   dl      display list words per frame, against the FT81x 2048 limit
+#   alloc   tracemalloc peak and retained bytes after the warm up, in a
+#           separate pass so tracing doesn't skew the timings
+# Host times are only comparable with other host runs; the point is to
+# compare releases and rates, not to predict device milliseconds.
+#
+#   python -m host.bench [--rates 10,20,50,100] [--samples N]
+#                        [--replay FILE.vbo] [--json results.json]
+# Exits 1 if a page's display list goes over the 2048 word limit. Load is
+# only reported: host CPU time can't say whether the unit keeps up.
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from host import harness
+
+FRAME_US = 16667
+DL_LIMIT = 2048
+RATES = (10, 20, 50, 100)
+PAGES = ('main', 'no_bar', 'combined', 'gauges', 'chart', 'map', 'corner')
+G = 9.80665
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+
+def _bearing(lat0, lon0, lat1, lon1):
+    """Heading in radians, clockwise from north, from one position in degrees to the next."""
+    east = math.radians(lon1 - lon0) * math.cos(math.radians(lat0))
+    north = math.radians(lat1 - lat0)
+    return math.atan2(east, north) % (2 * math.pi)
+
+
+def replayed(path, count):
+    """feed() keyword arguments from a .vbo file, looped to `count` samples.
+
+    Columns are found through vbo_reader.ALIASES. Only speed is required:
+    missing accelerations replay as 0, a missing heading is taken from the
+    bearing between consecutive positions, and a file without position
+    leaves the map and corners without a fix.
+    """
+    from vbo_reader import VBO_Reader
+    reader = VBO_Reader(path)
+    keys = [k for k in ('speed', 'lat', 'lon', 'heading', 'lat_g', 'long_g') if reader.find(k)]
+    if 'speed' not in keys:
+        raise ValueError('{}: no speed channel'.format(path))
+    has_position = 'lat' in keys and 'lon' in keys
+    rows = []
+    for row in reader.rows_from(0, *[reader.find(k) for k in keys]):
+        values = dict(zip(keys, row))
+        kw = {
+            'speed': values['speed'] / 3.6,
+            'lat': values.get('lat_g', 0.0) * G,
+            'lng': values.get('long_g', 0.0) * G,
+        }
+        if has_position:
+            kw['lat_deg'] = values['lat'] / 60.0
+            kw['lng_deg'] = -values['lon'] / 60.0  # .vbo longitude is positive west
+        if 'heading' in values:
+            kw['heading'] = math.radians(values['heading'])
+        elif has_position and rows:
+            prev = rows[-1]
+            if (kw['lat_deg'], kw['lng_deg']) == (prev['lat_deg'], prev['lng_deg']):
+                kw['heading'] = prev.get('heading', 0.0)  # standing still
+            else:
+                kw['heading'] = _bearing(prev['lat_deg'], prev['lng_deg'], kw['lat_deg'], kw['lng_deg'])
+        rows.append(kw)
+    if not rows:
+        raise ValueError('{}: no samples'.format(path))
+    for i in range(count):
+        yield rows[i % len(rows)]
+
+
+def _samples(args, count, rate):
+    if args.replay:
+        return list(replayed(args.replay, count))
+    return list(harness.synthetic(count, rate_hz=rate))
+
+
+def run_rate(app, gui, samples, rate, page, warmup):
+    period_us = 1000000 // rate
+    app.pages.show(page)
+    sample_ns = []
+    frame_ns = []
+    latency_us = []
+    words = []
+    next_frame = harness.now_us() + FRAME_US
+    pending = []  # (arrival us, callback ns) of samples not yet drawn
+    for i, kw in enumerate(samples):
+        measured = i >= warmup
+        arrival = harness.now_us()
+        t0 = time.perf_counter_ns()
+        harness.feed(**kw)
+        took = time.perf_counter_ns() - t0
+        if measured:
+            sample_ns.append(took)
+            pending.append((arrival, took))
+        end = arrival + period_us
+        while next_frame <= end:
+            harness.set_clock(next_frame)
+            t0 = time.perf_counter_ns()
+            harness.vsync()
+            took = time.perf_counter_ns() - t0
+            if measured:
+                frame_ns.append(took)
+                words.append(gui.last_words)
+                for at, cb_ns in pending:
+                    latency_us.append(next_frame - at + (cb_ns + took) // 1000)
+                pending = []
+            next_frame += FRAME_US
+        harness.set_clock(end)
+    duration_us = (len(samples) - warmup) * period_us
+    busy_us = (sum(sample_ns) + sum(frame_ns)) / 1000.0
+    return {
+        'rate_hz': rate,
+        'page': page,
+        'samples': len(sample_ns),
+        'frames': len(frame_ns),
+        'throughput_per_s': round(len(sample_ns) / (sum(sample_ns) / 1e9), 1) if sample_ns else 0,
+        'load': round(busy_us / duration_us, 4) if duration_us else 0,
+        'sample_us': _summary([n / 1000.0 for n in sample_ns]),
+        'frame_us': _summary([n / 1000.0 for n in frame_ns]),
+        'latency_us': _summary(latency_us),
+        'dl_words': {'p50': percentile(words, 50), 'max': max(words) if words else 0},
+    }
+
+
+def _summary(values):
+    return {
+        'p50': round(percentile(values, 50), 1),
+        'p99': round(percentile(values, 99), 1),
+        'max': round(max(values), 1) if values else 0,
+    }
+
+
+def alloc_rate(app, samples, rate, page, warmup):
+    # tracing starts before the warm up so display list words replaced
+    # after it were allocated under tracing (see host.alloc_check)
+    period_us = 1000000 // rate
+    app.pages.show(page)
+    next_frame = harness.now_us() + FRAME_US
+    tracemalloc.start()
+    try:
+        for i, kw in enumerate(samples):
+            if i == warmup:
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+            harness.feed(**kw)
+            end = harness.now_us() + period_us
+            while next_frame <= end:
+                harness.set_clock(next_frame)
+                harness.vsync()
+                next_frame += FRAME_US
+            harness.set_clock(end)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'peak_bytes': peak - before,
+        'retained_bytes': after - before,
+    }
+
+
+def _revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty'], cwd=harness.REPO,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _rates(text):
+    try:
+        return [int(r) for r in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected comma separated rates in Hz')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m host.bench')
+    parser.add_argument('--rates', type=_rates, default=list(RATES), help='sample rates in Hz')
+    parser.add_argument('--samples', type=int, default=3000, help='measured samples per rate and page')
+    parser.add_argument('--warmup', type=int, default=1600, help='samples before measuring, at least one chart window')
+    parser.add_argument('--pages', default=','.join(PAGES), help='pages to run, comma separated')
+    parser.add_argument('--replay', metavar='FILE.vbo', help='replay a recording instead of synthetic laps')
+    parser.add_argument('--json', metavar='PATH', help='write the results to PATH')
+    args = parser.parse_args(argv)
+
+    app = harness.load_app()
+    import gui
+    app.toggle_logging(None)
+    results = []
+    try:
+        for rate in args.rates:
+            for page in args.pages.split(','):
+                samples = _samples(args, args.warmup + args.samples, rate)
+                r = run_rate(app, gui, samples, rate, page, args.warmup)
+                r['alloc'] = alloc_rate(app, samples[:args.warmup + args.samples // 4], rate, page, args.warmup)
+                results.append(r)
+                print('{:>4} Hz {:<8} {:>9.0f}/s  load {:>6.2%}  sample p50 {:>6.1f} p99 {:>6.1f} us  '
+                      'frame p99 {:>7.1f} us  latency p99 {:>7.0f} us  DL {:>4}/{}  alloc peak {:>6} B held {:>5} B'.format(
+                          rate, page, r['throughput_per_s'], r['load'], r['sample_us']['p50'],
+                          r['sample_us']['p99'], r['frame_us']['p99'], r['latency_us']['p99'],
+                          r['dl_words']['max'], DL_LIMIT, r['alloc']['peak_bytes'], r['alloc']['retained_bytes']))
+    finally:
+        app.toggle_logging(None)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'revision': _revision(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'source': os.path.basename(args.replay) if args.replay else 'synthetic',
+                'results': results,
+            }, f, indent=2)
+    # load is host CPU time, it doesn't say whether the unit keeps up, so it's only reported
+    over = [r for r in results if r['dl_words']['max'] > DL_LIMIT]
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+##
+# @module    host.bench_math
+# @brief     Accuracy and cost of fast_math against the math module
+##
+
+# Runs fast_math.benchmark() on the host. The same call works on the unit
+# from the REPL (import fast_math; fast_math.benchmark()), which is the
+# timing that matters: host Python's math functions are C and the ratio
+# between the two is not the device's.
+#
+#   python -m host.bench_math [--vectors N]
+# Exits 1 if the errors exceed the bounds given in fast_math.
+
+import argparse
+import sys
+
+from host import harness
+
+MAX_REL_ERROR = 1e-5
+MAX_DEG_ERROR = 1e-3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m host.bench_math')
+    parser.add_argument('--vectors', type=int, default=20000, help='vectors to test')
+    args = parser.parse_args(argv)
+    harness.install()
+    import fast_math
+    mag_err, ang_err, _, _ = fast_math.benchmark(args.vectors)
+    return 0 if mag_err <= MAX_REL_ERROR and ang_err <= MAX_DEG_ERROR else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+##
+# @module    host.corners_check
+# @brief     Drives corners through Corner_Segmenter and checks the laps it counts
+##
+
+# Each case is a sequence of corners, by name, and the (corner id, lap) the
+# segmenter should report for each. A corner is 3 s of straight then 2 s of
+# 0.8 g with its min speed at the corner's position; a name ending in '~'
+# drives it split in two by a short dip below exit_g.
+#
+#   python -m host.corners_check
+# Exits 1 if any case reports other ids or laps.
+
+import sys
+
+from host import harness
+
+RATE_HZ = 20
+# position (m) and turn direction of each corner
+CORNERS = {
+    'A': (0.0, 0.0, 1),
+    'B': (400.0, 0.0, -1),
+    'C': (400.0, 300.0, 1),
+    'D': (200.0, 150.0, 1),
+}
+
+CASES = (
+    ('corner found mid-session',
+     'A B A D B',
+     ((0, 0), (1, 0), (0, 1), (2, 1), (1, 1))),
+    ('laps with a corner found on lap 3',
+     'A B  A B  A D B  A D B',
+     ((0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (2, 2), (1, 2), (0, 3), (2, 3), (1, 3))),
+    ('start/finish corner missed',
+     'A B C  B C  A B C',
+     ((0, 0), (1, 0), (2, 0), (1, 1), (2, 1), (0, 2), (1, 2), (2, 2))),
+    ('corner split in two',
+     'A B~ A B~',
+     ((0, 0), (1, 0), (1, 0), (0, 1), (1, 1), (1, 1))),
+    ('one corner lap',
+     'A A A',
+     ((0, 0), (0, 1), (0, 2))),
+)
+
+
+def _straight(seg, out, seconds):
+    for _ in range(int(seconds * RATE_HZ)):
+        if seg.update(40.0, 0.0, 0.1, 0.0, 0.0):
+            out.append((seg.last_id, seg.last_lap))
+
+
+def _turn(seg, out, name, seconds=2.0):
+    x, y, turn = CORNERS[name]
+    n = int(seconds * RATE_HZ)
+    for i in range(n):
+        # slowest half way through, at the corner's position
+        speed = 20.0 + abs(i - n // 2)
+        east, north = (x, y) if i == n // 2 else (x + 5.0, y + 5.0)
+        if seg.update(speed, 0.8 * turn, -0.3, east, north):
+            out.append((seg.last_id, seg.last_lap))
+
+
+def drive(route):
+    from corners import Corner_Segmenter
+    seg = Corner_Segmenter(RATE_HZ)
+    out = []
+    for name in route.split():
+        _straight(seg, out, 3.0)
+        if name.endswith('~'):
+            _turn(seg, out, name[0], 1.2)
+            _straight(seg, out, 0.3)
+            _turn(seg, out, name[0], 1.2)
+        else:
+            _turn(seg, out, name)
+    _straight(seg, out, 1.0)
+    return seg, out
+
+
+def kerb_before_braked_corner():
+    from corners import Corner_Segmenter
+    seg = Corner_Segmenter(RATE_HZ)
+    out = []
+    _straight(seg, out, 3.0)
+    for _ in range(RATE_HZ):
+        seg.update(40.0, 0.0, -1.0, 0.0, 0.0)  # 1 g braking
+    for _ in range(3):
+        seg.update(35.0, 0.6, 0.0, 0.0, 0.0)  # kerb, far shorter than min_s
+    _straight(seg, out, 0.2)
+    _turn(seg, out, 'A')
+    _straight(seg, out, 1.0)
+    return seg, out
+
+
+def main():
+    harness.install()
+    failed = False
+    for title, route, expected in CASES:
+        seg, got = drive(route)
+        ok = tuple(got) == expected
+        print('{:<36} {}'.format(title, 'ok' if ok else 'got {} expected {}'.format(got, list(expected))))
+        failed = failed or not ok
+    # the split pieces are merged into one corner lasting both
+    from corners import DURATION, PEAK_BRAKE
+    seg, _ = drive('B~')
+    duration = seg.get(0, 0, DURATION)
+    ok = abs(duration - 2.4) < 0.2
+    print('{:<36} {}'.format('split corner duration', 'ok' if ok else 'got {:.2f} s'.format(duration)))
+    failed = failed or not ok
+    # a kerb blip between braking and turn in keeps the braking peak
+    seg, out = kerb_before_braked_corner()
+    brake = seg.get(0, 0, PEAK_BRAKE) if out else None
+    ok = out == [(0, 0)] and brake is not None and abs(brake - 1.0) < 0.01
+    print('{:<36} {}'.format('kerb blip before turn in', 'ok' if ok else 'got {} brake {}'.format(out, brake)))
+    failed = failed or not ok
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+##
+# @module    host.dl_golden
+# @brief     Golden display list dumps and per page display list budgets
+##
+
+# Builds every registered page in every speed/accel unit combination on
+# the stand-ins, before any sample arrives, and writes each gui list as a
+# normalised dump, one line per display list word or widget:
+#   words     decoded to FT81x mnemonics, positions in pixels
+#   widgets   position, font, options and the text they show
+#   callbacks by name, so dumps don't depend on addresses
+# Runs of identical lines (the map's NOP padding) are folded into one.
+# Each dump is diffed against host/golden/<page>.<speed>.<accel>.txt and
+# each page is checked against its budget of display list words (counted
+# like gui.redraw() on the stand-in) and commands (words plus widgets).
+# Any growth already shows up as a golden diff to review, so the budgets
+# don't track current usage; they say whether a page still fits the FT81x
+# display list.
+#
+#   python -m host.dl_golden [--update] [--pages main,settings] [--verbose]
+# Exits 1 on any difference or budget overrun. --update rewrites the
+# goldens, review them with git diff; budgets are still enforced.
+
+import argparse
+import difflib
+import os
+import sys
+
+from host import harness
+
+GOLDEN_DIR = os.path.join(harness.REPO, 'host', 'golden')
+
+# The FT81x draws a frame from a 2048 word display list. DL_MARGIN is kept
+# back for what the stand-in's count leaves out: the firmware's own clear,
+# context and DISPLAY words, value text drawn longer than it was at build
+# time (one bitmap vertex per character, '-12.34' where '0.00' was built)
+# and error in its widget estimates. An eighth of the list covers those
+# with room to spare.
+DL_LIMIT = 2048
+DL_MARGIN = 256
+DL_BUDGET = DL_LIMIT - DL_MARGIN
+# Every command is at least one display list word, so commands can only go
+# over DL_BUDGET after the words have. Pages that have to stay smaller go
+# here as page: (words, commands), the largest over all unit combinations,
+# with the reason next to them.
+BUDGETS = {}
+
+_PRIM_NAMES = {1: 'BITMAPS', 2: 'POINTS', 3: 'LINES', 4: 'LINE_STRIP', 5: 'EDGE_STRIP_R',
+               6: 'EDGE_STRIP_L', 7: 'EDGE_STRIP_A', 8: 'EDGE_STRIP_B', 9: 'RECTS'}
+_SIMPLE = {0x21: 'END', 0x22: 'SAVE_CONTEXT', 0x23: 'RESTORE_CONTEXT', 0x2D: 'NOP'}
+
+
+def _signed(v, bits):
+    return v - (1 << bits) if v & (1 << (bits - 1)) else v
+
+
+def decode(word):
+    """FT81x mnemonic of one display list word."""
+    if word & 0x80000000:
+        return 'WORD 0x{:08X}'.format(word)
+    if word & 0x40000000:
+        return 'VERTEX2F {:g} {:g}'.format(_signed((word >> 15) & 0x7FFF, 15) / 16,
+                                           _signed(word & 0x7FFF, 15) / 16)
+    op = word >> 24
+    arg = word & 0xFFFFFF
+    if op in _SIMPLE:
+        return _SIMPLE[op]
+    if op == 0x04:
+        return 'COLOR_RGB #{:06X}'.format(arg)
+    if op == 0x02:
+        return 'CLEAR_COLOR_RGB #{:06X}'.format(arg)
+    if op == 0x0E:
+        return 'LINE_WIDTH {:g}'.format((arg & 0xFFF) / 16)
+    if op == 0x0D:
+        return 'POINT_SIZE {:g}'.format((arg & 0x1FFF) / 16)
+    if op == 0x1F:
+        return 'BEGIN {}'.format(_PRIM_NAMES.get(arg & 15, arg & 15))
+    if op == 0x03:
+        return 'TAG {}'.format(arg & 255)
+    if op == 0x1B:
+        return 'SCISSOR_XY {} {}'.format((arg >> 11) & 0x7FF, arg & 0x7FF)
+    if op == 0x1C:
+        return 'SCISSOR_SIZE {} {}'.format((arg >> 12) & 0xFFF, arg & 0xFFF)
+    if op == 0x26:
+        return 'CLEAR {} {} {}'.format((arg >> 2) & 1, (arg >> 1) & 1, arg & 1)
+    if op == 0x20:
+        return 'COLOR_MASK {} {} {} {}'.format((arg >> 3) & 1, (arg >> 2) & 1, (arg >> 1) & 1, arg & 1)
+    if op == 0x0C:
+        return 'STENCIL_OP {} {}'.format((arg >> 3) & 7, arg & 7)
+    if op == 0x0A:
+        return 'STENCIL_FUNC {} {} {}'.format((arg >> 16) & 15, (arg >> 8) & 255, arg & 255)
+    if op == 0x2A:
+        return 'PALETTE_SOURCE 0x{:06X}'.format(arg & 0x3FFFFF)
+    if op == 0x01:
+        return 'BITMAP_SOURCE 0x{:06X}'.format(arg & 0x3FFFFF)
+    if op == 0x07:
+        return 'BITMAP_LAYOUT {} {} {}'.format((arg >> 19) & 31, (arg >> 9) & 0x3FF, arg & 0x1FF)
+    if op == 0x08:
+        return 'BITMAP_SIZE {} {} {} {} {}'.format((arg >> 20) & 1, (arg >> 19) & 1, (arg >> 18) & 1,
+                                                   (arg >> 9) & 0x1FF, arg & 0x1FF)
+    return 'WORD 0x{:08X}'.format(word)
+
+
+def _name(fn):
+    return '<{}>'.format(getattr(fn, '__qualname__', None) or getattr(fn, '__name__', type(fn).__name__))
+
+
+def _value(v):
+    return v[0] if isinstance(v, list) else v
+
+
+def dump(gui, item, out):
+    """Appends the normalised lines of a gui list item to `out`."""
+    if isinstance(item, int):
+        out.append(decode(item))
+        return
+    if callable(item):
+        out.append(_name(item))
+        return
+    if not isinstance(item, list) or not item:
+        out.append(repr(item))
+        return
+    head = item[0]
+    if isinstance(head, list):
+        for i in item:
+            dump(gui, i, out)
+    elif head in gui.PRIMS and len(item) == 2 and isinstance(item[1], list):
+        out.append('BEGIN {}'.format(_PRIM_NAMES[head]))
+        for w in item[1]:
+            dump(gui, w, out)
+        out.append('END')
+    elif head == gui.CTRL_TEXT:
+        out.append('TEXT {} {} {} 0x{:X} {!r}'.format(item[1], item[2], item[3], item[4], str(_value(item[5]))))
+    elif head in (gui.CTRL_BUTTON, gui.CTRL_FLATBUTTON):
+        out.append('{} {} {} {} {} {} {!r} {}'.format(
+            'BUTTON' if head == gui.CTRL_BUTTON else 'FLATBUTTON', item[1], item[2], item[3], item[4],
+            _value(item[5]), str(_value(item[6])), _name(item[7])))
+    elif head == gui.EVT_VSYNC:
+        out.append('@VSYNC {}'.format(_name(item[1])))
+    elif head == gui.EVT_SWIPE:
+        out.append('@SWIPE {} {}'.format(item[1], _name(item[2])))
+    elif head == gui.EVT_PRESS:
+        out.append('@PRESS {}'.format(_name(item[1])))
+    elif head == gui.PARAM_CLRCOLOR:
+        out.append('@CLRCOLOR #{:06X}'.format(item[1]))
+    elif head == gui.PARAM_TAG_REGISTER:
+        out.append('@TAG_REGISTER {} {}'.format(_name(item[1]), ' '.join(str(i) for i in item[2:])))
+    elif head == gui.SUBLIST:
+        for i in item[1:]:
+            dump(gui, i, out)
+    else:
+        for i in item:
+            dump(gui, i, out)
+
+
+def fold(lines):
+    """Folds runs of identical lines into '<line> xN'."""
+    out = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j < len(lines) and lines[j] == lines[i]:
+            j += 1
+        out.append(lines[i] if j - i == 1 else '{} x{}'.format(lines[i], j - i))
+        i = j
+    return out
+
+
+def _slug(option):
+    return ''.join(c for c in option.lower() if c.isalnum())
+
+
+def render(app, gui, pages):
+    """Yields (page, speed, accel, lines, words, commands) for every page in every unit combination."""
+    for speed in app.speed_options:
+        for accel in app.accel_options:
+            app.use_speed(speed)
+            app.use_accel(accel)
+            if app.speed_loopbutton is not None:
+                app.speed_loopbutton.set_btn(speed)
+                app.acceleration_loopbutton.set_btn(accel)
+            for name in pages:
+                gui_l = app.pages.pages[name].build()
+                lines = []
+                dump(gui, gui_l, lines)
+                commands = sum(1 for line in lines if not line.startswith('@'))
+                yield name, speed, accel, lines, gui.dl_words(gui_l), commands
+
+
+def run(pages=None, update=False, verbose=False):
+    app = harness.load_app()
+    import gui
+    pages = pages or list(app.pages.pages)
+    failed = False
+    largest = {}
+    for name, speed, accel, lines, words, commands in render(app, gui, pages):
+        text = '\n'.join(fold(lines)) + '\n'
+        path = os.path.join(GOLDEN_DIR, '{}.{}.{}.txt'.format(name, _slug(speed), _slug(accel)))
+        rel = os.path.relpath(path, harness.REPO)
+        if update:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text)
+        elif not os.path.exists(path):
+            print('{}: no golden, run with --update'.format(rel))
+            failed = True
+        else:
+            with open(path) as f:
+                golden = f.read()
+            if golden != text:
+                failed = True
+                diff = list(difflib.unified_diff(golden.splitlines(), text.splitlines(), rel, 'rendered', lineterm=''))
+                print('{}: differs'.format(rel))
+                for line in diff if verbose else diff[:40]:
+                    print('  ' + line)
+                if not verbose and len(diff) > 40:
+                    print('  ... {} more lines, --verbose shows all'.format(len(diff) - 40))
+        w, c = largest.get(name, (0, 0))
+        largest[name] = (max(w, words), max(c, commands))
+    for name in pages:
+        words, commands = largest[name]
+        budget = BUDGETS.get(name, (DL_BUDGET, DL_BUDGET))
+        ok = words <= budget[0] and commands <= budget[1]
+        print('{:<10} DL {:>5}/{:<5} words {:>5}/{:<5} commands  {}'.format(
+            name, words, budget[0], commands, budget[1], 'ok' if ok else 'OVER'))
+        failed = failed or not ok
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--update', action='store_true', help='rewrite the golden dumps')
+    parser.add_argument('--pages', help='pages to check, comma separated, default all')
+    parser.add_argument('--verbose', action='store_true', help='print whole diffs')
+    args = parser.parse_args(argv)
+    pages = args.pages.split(',') if args.pages else None
+    return 0 if run(pages, args.update, args.verbose) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
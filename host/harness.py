@@ -0,0 +1,126 @@
+##
+# @module    host.harness
+# @brief     Runs GForceDisplay on the host against the module stand-ins
+##
+
+# load_app() puts host/standins first on sys.path, points /sd at a scratch
+# directory holding the icons, and imports GForceDisplay, which runs main()
+# exactly as on the device. feed() then plays one sample through the vbox
+# data callback and vsync() runs the shown page's vsync callback.
+
+import builtins
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STANDINS = os.path.join(REPO, 'host', 'standins')
+SD_ROOT = None
+_clock_us = None
+_open = builtins.open
+
+
+def now_us():
+    """Harness clock if one was set with set_clock(), else the host clock."""
+    if _clock_us is None:
+        return int(time.perf_counter() * 1000000)
+    return _clock_us
+
+
+def set_clock(us):
+    global _clock_us
+    _clock_us = us
+
+
+def advance_clock(us):
+    global _clock_us
+    _clock_us = (_clock_us or 0) + us
+
+
+def sd_path(path):
+    path = os.fspath(path)
+    if SD_ROOT is not None and (path == '/sd' or path.startswith('/sd/')):
+        return SD_ROOT + path[3:]
+    return path
+
+
+def _sd_open(file, *args, **kwargs):
+    if isinstance(file, (str, os.PathLike)):
+        file = sd_path(file)
+    return _open(file, *args, **kwargs)
+
+
+def install(sd_root=None):
+    """Makes the stand-ins importable and maps /sd, returns the /sd directory."""
+    global SD_ROOT
+    if STANDINS not in sys.path:
+        sys.path.insert(0, STANDINS)
+    if REPO not in sys.path:
+        sys.path.insert(1, REPO)
+    if SD_ROOT is None:
+        SD_ROOT = sd_root or tempfile.mkdtemp(prefix='gforce_sd_')
+        for name in os.listdir(REPO):
+            if name.endswith('.png'):
+                shutil.copy(os.path.join(REPO, name), SD_ROOT)
+        builtins.open = _sd_open
+    return SD_ROOT
+
+
+def load_app(sd_root=None):
+    install(sd_root)
+    set_clock(_clock_us or 0)
+    import GForceDisplay
+    return GForceDisplay
+
+
+def feed(speed=0.0, lat=0.0, lng=0.0, vert=0.0, sats=12, time_ms=None, lat_deg=None, lng_deg=None, heading=0.0):
+    """Plays one sample through the registered vbox data callback.
+
+    The stand-in sample object is updated in place so feeding doesn't allocate.
+    """
+    import vbox
+    s = vbox.sample
+    s.speed_gnd_mps = speed
+    s.latacc_smooth_mps2 = lat
+    s.lngacc_smooth_mps2 = lng
+    s.speed_up_mps = vert
+    s.sats_used = sats
+    s.utc_time_ms = now_us() // 1000 if time_ms is None else time_ms
+    s.heading_rad = heading
+    if lat_deg is not None:
+        s.lat_rad = math.radians(lat_deg)
+        s.lng_rad = math.radians(lng_deg)
+    vbox.callback()
+
+
+def vsync():
+    import gui
+    cb = gui.find_event(gui.EVT_VSYNC)
+    if cb is not None:
+        cb(None)
+
+
+def synthetic(count, rate_hz=20, lap_s=60.0, radius_m=300.0, lat0=52.0, lng0=-1.0):
+    """Samples driving laps of a wobbly circle: dicts of feed() keyword arguments."""
+    dt = 1.0 / rate_hz
+    for i in range(count):
+        t = i * dt
+        phase = 2 * math.pi * t / lap_s
+        speed = 30.0 + 12.0 * math.sin(4 * phase)
+        lat_acc = speed * speed / radius_m * (1.0 + 0.4 * math.sin(4 * phase + 1.0))
+        lng_acc = 48.0 / lap_s * 2 * math.pi * math.cos(4 * phase)
+        north = radius_m * math.sin(phase)
+        east = radius_m * math.cos(phase)
+        yield {
+            'speed': speed,
+            'lat': lat_acc,
+            'lng': lng_acc,
+            'vert': 0.1 * math.sin(phase),
+            'time_ms': int(t * 1000),
+            'lat_deg': lat0 + math.degrees(north / 6371000.0),
+            'lng_deg': lng0 + math.degrees(east / (6371000.0 * math.cos(math.radians(lat0)))),
+            'heading': (phase + math.pi / 2) % (2 * math.pi),
+        }
@@ -0,0 +1,11 @@
+# Host stand-in for `gnss`
+
+commands = []
+
+
+def init_status():
+    return 0
+
+
+def command(cmd):
+    commands.append(cmd)
@@ -0,0 +1,195 @@
+# Host stand-in for the VBOX Touch `gui` module.
+#
+# DL_* helpers return real FT81x display list words. gui.show() keeps the
+# list, gui.redraw() walks it like the device does and records how many
+# display list words it expands to (see dl_words for the widget estimates).
+
+PRIM_BITMAPS = 1
+PRIM_POINTS = 2
+PRIM_LINES = 3
+PRIM_LINE_STRIP = 4
+PRIM_EDGE_STRIP_R = 5
+PRIM_EDGE_STRIP_L = 6
+PRIM_EDGE_STRIP_A = 7
+PRIM_EDGE_STRIP_B = 8
+PRIM_RECTS = 9
+PRIMS = frozenset(range(1, 10))
+
+# list heads that aren't display list words, values only need to be distinct
+CTRL_TEXT = -1
+CTRL_BUTTON = -2
+CTRL_FLATBUTTON = -3
+EVT_VSYNC = -20
+EVT_SWIPE = -21
+EVT_PRESS = -22
+PARAM_CLRCOLOR = -40
+PARAM_TAG_REGISTER = -41
+SUBLIST = -60
+CTRLS = frozenset((CTRL_TEXT, CTRL_BUTTON, CTRL_FLATBUTTON))
+EVTS = frozenset((EVT_VSYNC, EVT_SWIPE, EVT_PRESS))
+PARAMS = frozenset((PARAM_CLRCOLOR, PARAM_TAG_REGISTER))
+
+OPT_CENTERX = 0x200
+OPT_CENTERY = 0x400
+OPT_CENTER = 0x600
+OPT_RIGHTX = 0x800
+
+
+def RGB(r, g, b):
+    return ((r & 255) << 16) | ((g & 255) << 8) | (b & 255)
+
+
+def DL_VERTEX2F(x, y):
+    return 0x40000000 | ((int(x * 16) & 0x7FFF) << 15) | (int(y * 16) & 0x7FFF)
+
+
+def DL_COLOR(rgb):
+    return 0x04000000 | (rgb & 0xFFFFFF)
+
+
+def DL_COLOR_RGB(r, g, b):
+    return DL_COLOR(RGB(r, g, b))
+
+
+def DL_CLEAR_COLOR_RGB(r, g, b):
+    return 0x02000000 | RGB(r, g, b)
+
+
+def DL_LINE_WIDTH(w):
+    return 0x0E000000 | (int(w * 16) & 0xFFF)
+
+
+def DL_BEGIN(prim):
+    return 0x1F000000 | (prim & 15)
+
+
+def DL_END():
+    return 0x21000000
+
+
+def DL_TAG(tag):
+    return 0x03000000 | (tag & 255)
+
+
+def DL_SAVE_CONTEXT():
+    return 0x22000000
+
+
+def DL_RESTORE_CONTEXT():
+    return 0x23000000
+
+
+def DL_NOP():
+    return 0x2D000000
+
+
+def DL_CLEAR(c, s, t):
+    return 0x26000000 | (c << 2) | (s << 1) | t
+
+
+def DL_COLOR_MASK(r, g, b, a):
+    return 0x20000000 | (r << 3) | (g << 2) | (b << 1) | a
+
+
+def DL_STENCIL_OP(sfail, spass):
+    return 0x0C000000 | (sfail << 3) | spass
+
+
+def DL_STENCIL_FUNC(func, ref, mask):
+    return 0x0A000000 | (func << 16) | (ref << 8) | mask
+
+
+def DL_SCISSOR_XY(x, y):
+    return 0x1B000000 | ((x & 0x7FF) << 11) | (y & 0x7FF)
+
+
+def DL_SCISSOR_SIZE(w, h):
+    return 0x1C000000 | ((w & 0xFFF) << 12) | (h & 0xFFF)
+
+
+def DL_PALETTE_SOURCE(addr):
+    return 0x2A000000 | (addr & 0x3FFFFF)
+
+
+def DL_BITMAP_SOURCE(addr):
+    return 0x01000000 | (addr & 0x3FFFFF)
+
+
+def DL_BITMAP_LAYOUT(fmt, stride, height):
+    return 0x07000000 | (fmt << 19) | ((stride & 0x3FF) << 9) | (height & 0x1FF)
+
+
+def DL_BITMAP_SIZE(filt, wrapx, wrapy, width, height):
+    return 0x08000000 | (filt << 20) | (wrapx << 19) | (wrapy << 18) | ((width & 0x1FF) << 9) | (height & 0x1FF)
+
+
+class _Swipe:
+    dx = 0
+    dy = 0
+
+
+swipe = _Swipe()
+shown = None
+shows = 0
+redraws = 0
+last_words = 0
+paused = False
+
+
+def swipe_info():
+    return swipe
+
+
+def pause(state):
+    global paused
+    paused = state
+
+
+def show(gui_l):
+    global shown, shows
+    shown = gui_l
+    shows += 1
+
+
+def _text(value):
+    return value[0] if isinstance(value, list) else value
+
+
+def dl_words(item):
+    """Display list words `item` expands to.
+
+    Text is estimated as 4 setup words plus one bitmap vertex per character,
+    buttons as 20 words plus their text.
+    """
+    if isinstance(item, int):
+        return 1
+    if not isinstance(item, list) or not item:
+        return 0
+    head = item[0]
+    if isinstance(head, list):
+        return sum(dl_words(i) for i in item)
+    if head in PRIMS and len(item) == 2 and isinstance(item[1], list):
+        return 2 + sum(dl_words(i) for i in item[1])
+    if head == CTRL_TEXT:
+        return 4 + len(str(_text(item[5])))
+    if head in (CTRL_BUTTON, CTRL_FLATBUTTON):
+        return 20 + len(str(_text(item[6])))
+    if head in EVTS or head in PARAMS:
+        return 0
+    if head == SUBLIST:
+        return sum(dl_words(i) for i in item[1:])
+    return sum(dl_words(i) for i in item)
+
+
+def redraw():
+    global redraws, last_words
+    redraws += 1
+    last_words = dl_words(shown) if shown is not None else 0
+
+
+def find_event(evt):
+    """Callback registered for `evt` in the shown list, or None."""
+    for item in shown or ():
+        if isinstance(item, list) and item and item[0] == evt:
+            return item[-1]
+    return None
@@ -0,0 +1,5 @@
+# Host stand-in for the MicroPython `micropython` module
+
+
+def const(value):
+    return value
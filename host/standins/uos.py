@@ -0,0 +1,21 @@
+# Host stand-in for `uos`, /sd paths are redirected to harness.SD_ROOT
+
+import os
+
+from host import harness
+
+
+def listdir(path='.'):
+    return os.listdir(harness.sd_path(path))
+
+
+def stat(path):
+    return os.stat(harness.sd_path(path))
+
+
+def remove(path):
+    os.remove(harness.sd_path(path))
+
+
+def rename(old, new):
+    os.rename(harness.sd_path(old), harness.sd_path(new))
@@ -0,0 +1,4 @@
+# Host stand-in for `usocket`, the real socket module so telemetry can be
+# received on a local socket
+
+from socket import *  # noqa: F401,F403
@@ -0,0 +1,28 @@
+# Host stand-in for `ustruct`: formats without a byte order prefix use
+# MicroPython's 32 bit sizes ('L' is 4 bytes) instead of the host's native ones
+
+import struct
+
+
+def _fmt(fmt):
+    return fmt if fmt[:1] in ('<', '>', '!', '=', '@') else '<' + fmt
+
+
+def calcsize(fmt):
+    return struct.calcsize(_fmt(fmt))
+
+
+def pack(fmt, *values):
+    return struct.pack(_fmt(fmt), *values)
+
+
+def pack_into(fmt, buf, offset, *values):
+    struct.pack_into(_fmt(fmt), buf, offset, *values)
+
+
+def unpack(fmt, data):
+    return struct.unpack(_fmt(fmt), data)
+
+
+def unpack_from(fmt, data, offset=0):
+    return struct.unpack_from(_fmt(fmt), data, offset)
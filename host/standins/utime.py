@@ -0,0 +1,25 @@
+# Host stand-in for `utime`, driven by the harness clock when one is set
+
+import time
+
+from host import harness
+
+
+def ticks_ms():
+    return harness.now_us() // 1000
+
+
+def ticks_us():
+    return harness.now_us()
+
+
+def ticks_diff(a, b):
+    return a - b
+
+
+def ticks_add(a, b):
+    return a + b
+
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
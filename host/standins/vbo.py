@@ -0,0 +1,17 @@
+# Host stand-in for `vbo`
+
+_status = 0
+
+
+def start():
+    global _status
+    _status = 2
+
+
+def stop():
+    global _status
+    _status = 0
+
+
+def get_status():
+    return _status
@@ -0,0 +1,35 @@
+# Host stand-in for `vbox`, the harness sets `sample` and calls `callback`
+
+VBOX_SRC_GNSS_BASIC = 1
+
+
+class Sample:
+    def __init__(self, **fields):
+        self.utc_time_ms = 0
+        self.sats_used = 0
+        self.speed_gnd_mps = 0.0
+        self.latacc_smooth_mps2 = 0.0
+        self.lngacc_smooth_mps2 = 0.0
+        self.speed_up_mps = 0.0
+        self.lat_rad = 0.0
+        self.lng_rad = 0.0
+        self.heading_rad = 0.0
+        for k, v in fields.items():
+            setattr(self, k, v)
+
+
+sample = Sample()
+callback = None
+
+
+def get_sample_hp():
+    return sample
+
+
+def init(source):
+    pass
+
+
+def set_new_data_callback(cb):
+    global callback
+    callback = cb
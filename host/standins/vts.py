@@ -0,0 +1,22 @@
+# Host stand-in for `vts`
+
+led_state = (0,) * 12
+led_writes = 0
+
+
+def leds(*values):
+    global led_state, led_writes
+    led_state = values
+    led_writes += 1
+
+
+def sd_present():
+    return True
+
+
+def delay_ms(ms):
+    pass
+
+
+def unit_info():
+    return {'GNSS Engine': 'UBLOX M8'}
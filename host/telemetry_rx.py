@@ -0,0 +1,168 @@
+##
+# @module    host.telemetry_rx
+# @brief     Receives and displays the app's live telemetry frames
+##
+
+# Listens for telemetry frames on UDP and prints one line per frame with the
+# newest record, the record rate and packet/record loss. Records can also be
+# appended to a CSV file.
+#
+#   python -m host.telemetry_rx [--port 9870] [--csv out.csv]
+#   python -m host.telemetry_rx --loopback 2000
+# --loopback runs the app on the host stand-ins, streaming synthetic samples
+# to this receiver over a local socket, and exits 1 if anything went missing.
+
+import argparse
+import socket
+import sys
+import time
+
+from host import harness
+
+SAMPLE_US = 50000
+FRAME_US = 16667
+
+
+class Receiver:
+    """Decodes frames and keeps loss counters, independent of the socket."""
+
+    def __init__(self, fmt=None, names=None):
+        self.fmt = fmt
+        self.names = names
+        self.frames = 0
+        self.records = 0
+        self.lost_frames = 0
+        self.device_dropped = 0
+        self.undecoded = 0
+        self.next_frame = None
+        self.last = None
+
+    def feed(self, data):
+        """Handles one datagram, returns the decoded records (empty for schema frames)."""
+        from telemetry import DATA_MAGIC, SCHEMA_MAGIC, Schema_Mismatch, decode_frame, decode_schema
+        magic = bytes(data[:2])
+        try:
+            if magic == SCHEMA_MAGIC:
+                self.fmt, self.names = decode_schema(data)
+                return []
+            if magic != DATA_MAGIC or self.fmt is None:
+                self.undecoded += 1
+                return []
+            (frame_seq, first, dropped), records = decode_frame(data, self.fmt)
+        except Schema_Mismatch:
+            # the device restarted with other channels, wait for its next schema
+            self.fmt = None
+            self.names = None
+            self.undecoded += 1
+            return []
+        except ValueError:
+            self.undecoded += 1
+            return []
+        if self.next_frame is not None and frame_seq > self.next_frame:
+            self.lost_frames += frame_seq - self.next_frame
+        self.next_frame = frame_seq + 1
+        self.device_dropped = dropped
+        self.frames += 1
+        self.records += len(records)
+        if records:
+            self.last = records[-1]
+        return records
+
+
+def _listen(port, bind):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((bind, port))
+    return sock
+
+
+def _line(rx, rate):
+    values = '  '.join('{}={:.2f}'.format(n, v) for n, v in zip(rx.names or (), rx.last or ()))
+    return 'frames {:>6} records {:>7} {:>6.1f}/s lost frames {} dropped {} undecoded {}  {}'.format(
+        rx.frames, rx.records, rate, rx.lost_frames, rx.device_dropped, rx.undecoded, values)
+
+
+def receive(args):
+    sock = _listen(args.port, args.bind)
+    rx = Receiver()
+    csv = open(args.csv, 'a') if args.csv else None
+    header = False
+    start = time.monotonic()
+    try:
+        while True:
+            data, _ = sock.recvfrom(2048)
+            records = rx.feed(data)
+            if csv is not None and records:
+                if not header:
+                    csv.write(','.join(rx.names) + '\n')
+                    header = True
+                for r in records:
+                    csv.write(','.join(str(v) for v in r) + '\n')
+            if records:
+                print(_line(rx, rx.records / max(time.monotonic() - start, 1e-6)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        if csv is not None:
+            csv.close()
+    return 0
+
+
+def loopback(args):
+    sock = _listen(0, '127.0.0.1')
+    sock.setblocking(False)
+    port = sock.getsockname()[1]
+    app = harness.load_app()
+    from telemetry import Telemetry
+    app.telemetry = Telemetry(app.session_channels, '127.0.0.1', port)
+    app.telemetry.start()
+    rx = Receiver()
+    next_frame = harness.now_us() + FRAME_US
+
+    def drain():
+        while True:
+            try:
+                data, _ = sock.recvfrom(2048)
+            except BlockingIOError:
+                return
+            rx.feed(data)
+
+    for kw in harness.synthetic(args.loopback):
+        harness.feed(**kw)
+        end = harness.now_us() + SAMPLE_US
+        while next_frame <= end:
+            harness.set_clock(next_frame)
+            harness.vsync()
+            next_frame += FRAME_US
+        harness.set_clock(end)
+        drain()
+    while app.telemetry.head > app.telemetry.tail:
+        app.telemetry.service(True)
+    app.telemetry.stop()
+    time.sleep(0.05)
+    drain()
+    sock.close()
+    print(_line(rx, 0.0))
+    missing = args.loopback - rx.records
+    print('sent {} received {} missing {} send errors {}'.format(
+        args.loopback, rx.records, missing, app.telemetry.send_errors))
+    return 1 if missing or rx.lost_frames or rx.undecoded else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m host.telemetry_rx')
+    parser.add_argument('--port', type=int, default=9870, help='UDP port to listen on')
+    parser.add_argument('--bind', default='0.0.0.0', help='address to listen on')
+    parser.add_argument('--csv', metavar='PATH', help='append the records to PATH')
+    parser.add_argument('--loopback', type=int, metavar='SAMPLES',
+                        help='stream SAMPLES synthetic samples from the app on the stand-ins and check them')
+    args = parser.parse_args(argv)
+    if args.loopback:
+        return loopback(args)
+    if harness.REPO not in sys.path:
+        sys.path.insert(0, harness.REPO)  # telemetry decodes with plain struct on the host
+    return receive(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
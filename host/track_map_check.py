@@ -0,0 +1,78 @@
+##
+# @module    host.track_map_check
+# @brief     Feeds track_map adversarial tracks and checks it stays in its words
+##
+
+# Douglas-Peucker keeps every point of a track that turns hard at each one,
+# and alternating G colours cost a colour word per vertex, so zigzags with
+# changing colours are the worst case for decimation. Each track is fed to
+# maps of several capacities; after every point the kept points and used
+# words must be within capacity, with room for the tail word.
+#
+#   python -m host.track_map_check [--points N]
+# Exits 1 on an overrun or exception.
+
+import argparse
+import math
+import sys
+
+from host import harness
+
+CAPACITIES = (16, 60, 200, 800)
+
+
+def zigzag(n, amplitude=500.0, step=5.0, every=3):
+    """Hard alternating turns with the colour changing on every point."""
+    for i in range(n):
+        side = amplitude if (i // every) % 2 else -amplitude
+        g = 1.0 if i % 2 else -1.0
+        yield i * step, side, (g, 0.0) if i % 4 < 2 else (0.0, g)
+
+
+def spiral(n):
+    """Ever wider loops, so the view keeps refitting while decimating."""
+    for i in range(n):
+        a = i * 0.3
+        r = 20.0 + i * 0.8
+        yield r * math.cos(a), r * math.sin(a), (math.sin(i), math.cos(i * 1.7))
+
+
+def noise(n, seed=1):
+    """Random jumps hundreds of metres apart."""
+    x = seed
+    for i in range(n):
+        x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+        e = (x % 2000) - 1000.0
+        x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+        yield e, (x % 2000) - 1000.0, ((x % 7) / 3.0 - 1.0, (x % 5) / 2.0 - 1.0)
+
+
+def check(track, points, capacity):
+    from track_map import Track_Map
+    m = Track_Map(0, 0, 400, 400, capacity=capacity)
+    for i, (east, north, (lat_g, long_g)) in enumerate(track(points)):
+        try:
+            m.add_local(east, north, lat_g, long_g)
+        except Exception as e:
+            return 'point {}: {!r}'.format(i, e)
+        if m.count > capacity or m.used + 1 > capacity or len(m.words) != capacity + 2:
+            return 'point {}: count {} used {} of {}'.format(i, m.count, m.used, capacity)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m host.track_map_check')
+    parser.add_argument('--points', type=int, default=3000, help='points per track')
+    args = parser.parse_args(argv)
+    harness.install()
+    failed = False
+    for track in (zigzag, spiral, noise):
+        for capacity in CAPACITIES:
+            error = check(track, args.points, capacity)
+            print('{:<8} capacity {:>4}  {}'.format(track.__name__, capacity, error or 'ok'))
+            failed = failed or error is not None
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -98,13 +98,25 @@ class Image:
 
 
 class Image_Bank:
-    def __init__(self, img_descriptions, ptr=ft.RAM_G):
+    # Images named in `lazy` are only decoded on their first get(), after
+    # whatever was loaded before them
+    def __init__(self, img_descriptions, ptr=ft.RAM_G, lazy=()):
         self.start = ptr
         self.bank = {}
+        self.files = {}
         for file_name, image_name in img_descriptions:
-            new_image = Image(file_name, self.start)
-            self.bank[image_name] = new_image
-            self.start = new_image.get_end()
+            self.files[image_name] = file_name
+            if image_name not in lazy:
+                self._load(image_name)
+
+    def _load(self, name):
+        new_image = Image(self.files[name], self.start)
+        self.bank[name] = new_image
+        self.start = new_image.get_end()
+        return new_image
 
     def get(self, name):
-        return self.bank[name]
+        image = self.bank.get(name)
+        if image is None:
+            image = self._load(name)
+        return image
@@ -0,0 +1,159 @@
+##
+# @module    layout
+# @brief     Declarative value grid compiled into gui display lists
+# @version   1.0
+##
+
+# A Grid is declared once as a list of Cells (title, unit and value slot)
+# and compiled for any x offset, width and set of units. Compiled lists are
+# memoised, so switching pages or units back and forth reuses them.
+# Superscript positions (the "2" in m/s2) come from the ROM font width
+# tables instead of hand-tuned coordinates.
+
+import ft8xx as ft
+import gui
+from micropython import const
+
+_ROM_FONTROOT = const(0x2FFFFC)
+_FONT_METRIC_SIZE = const(148)
+_FIRST_ROM_FONT = const(16)
+
+_font_widths = {}
+
+
+def char_widths(font):
+    """128 byte width table of a ROM font, read once from the FT8xx."""
+    widths = _font_widths.get(font)
+    if widths is None:
+        widths = bytearray(128)
+        root = ft.rd32(_ROM_FONTROOT)
+        ft.rdbuf(root + _FONT_METRIC_SIZE * (font - _FIRST_ROM_FONT), widths)
+        _font_widths[font] = widths
+    return widths
+
+
+def text_width(text, font):
+    widths = char_widths(font)
+    width = 0
+    for c in text:
+        width += widths[ord(c) & 0x7F]
+    return width
+
+
+def unit_label(title, unit):
+    """Label text for a cell, leaving a space for the superscript if there is one."""
+    text, sup = unit
+    if not text:
+        return title
+    return '{} ({}{})'.format(title, text, ' ' if sup else '')
+
+
+class Cell:
+    def __init__(self, title, unit, value, colour=None):
+        """
+        Args:
+            title (str): label text before the unit
+            unit (str): key into the units dict given to Grid.compile
+            value (callable): returns the one element string list to display
+            colour (list, optional): one element colour list for the value
+        """
+        self.title = title
+        self.unit = unit
+        self.value = value
+        self.colour = colour
+
+
+class Grid:
+    def __init__(self, cols, cells, row_height=160, band=50, title_font=30, value_font=34, sup_font=23):
+        self.cols = cols
+        self.rows = (len(cells) + cols - 1) // cols
+        self.cells = cells
+        self.row_height = row_height
+        self.band = band
+        self.title_font = title_font
+        self.value_font = value_font
+        self.sup_font = sup_font
+        self._compiled = {}
+
+    def compile(self, x, width, units):
+        """
+        Args:
+            x (int): left edge of the grid
+            width (int): grid width, split evenly between the columns
+            units (dict): unit key -> (text, superscript) e.g. {'accel': ('m/s', '2')}
+        Returns:
+            list: top level gui list items, shared between calls with the same arguments
+        """
+        key = (x, width, tuple(units[c.unit] for c in self.cells))
+        gui_l = self._compiled.get(key)
+        if gui_l is None:
+            gui_l = self._build(x, width, units)
+            self._compiled[key] = gui_l
+        return gui_l
+
+    def clear(self):
+        self._compiled = {}
+
+    def _build(self, x, width, units):
+        col_w = width // self.cols
+        height = self.rows * self.row_height
+        right = x + width
+        gui_l = [[gui.DL_COLOR_RGB(200, 200, 200)]]
+        for row in range(self.rows):
+            top = row * self.row_height
+            gui_l.append([gui.PRIM_RECTS, [
+                gui.DL_VERTEX2F(x, top),
+                gui.DL_VERTEX2F(right, top + self.band),
+            ]])
+
+        gui_l.append([gui.DL_COLOR_RGB(0, 0, 0)])
+        gui_l.append([gui.PRIM_LINE_STRIP, [
+            gui.DL_LINE_WIDTH(2),
+            gui.DL_VERTEX2F(x, 0),
+            gui.DL_VERTEX2F(right, 0),
+            gui.DL_VERTEX2F(right, height),
+            gui.DL_VERTEX2F(x, height),
+            gui.DL_VERTEX2F(x, 0),
+        ]])
+        for col in range(1, self.cols):
+            gui_l.append([gui.PRIM_LINE_STRIP, [
+                gui.DL_LINE_WIDTH(2),
+                gui.DL_VERTEX2F(x + col * col_w, 0),
+                gui.DL_VERTEX2F(x + col * col_w, height),
+            ]])
+        for row in range(self.rows):
+            top = row * self.row_height
+            gui_l.append([gui.PRIM_LINE_STRIP, [
+                gui.DL_LINE_WIDTH(1),
+                gui.DL_VERTEX2F(x, top + self.band),
+                gui.DL_VERTEX2F(right, top + self.band),
+            ]])
+            if row:
+                gui_l.append([gui.PRIM_LINE_STRIP, [
+                    gui.DL_LINE_WIDTH(2),
+                    gui.DL_VERTEX2F(x, top),
+                    gui.DL_VERTEX2F(right, top),
+                ]])
+
+        for i, cell in enumerate(self.cells):
+            cx = x + (i % self.cols) * col_w + 10
+            cy = (i // self.cols) * self.row_height + 10
+            unit = units[cell.unit]
+            gui_l.append([gui.CTRL_TEXT, cx, cy, self.title_font, 0, unit_label(cell.title, unit)])
+            if unit[1]:
+                before = '{} ({}'.format(cell.title, unit[0])
+                sup_x = cx + text_width(before, self.title_font) + text_width(' ', self.title_font) // 2
+                gui_l.append([gui.CTRL_TEXT, sup_x, cy, self.sup_font, gui.OPT_CENTERX, unit[1]])
+
+        coloured = False
+        for i, cell in enumerate(self.cells):
+            if cell.colour is not None:
+                gui_l.append(cell.colour)
+                coloured = True
+            elif coloured:
+                gui_l.append([gui.DL_COLOR_RGB(0, 0, 0)])
+                coloured = False
+            centre = x + (i % self.cols) * col_w + col_w // 2
+            top = (i // self.cols) * self.row_height + self.band
+            gui_l.append([gui.CTRL_TEXT, centre, top, self.value_font, gui.OPT_CENTERX, cell.value()])
+        return gui_l
@@ -0,0 +1,80 @@
+##
+# @module    led_bar
+# @brief     12 LED G-meter / shift-light bar with precomputed patterns
+# @version   1.0
+##
+
+# Every pattern the bar can show is built once into a tuple indexed by the
+# quantised input level, so each sample costs one multiply, a clamp and an
+# integer compare. vts.leds is only called when the level changes.
+
+import vts
+from micropython import const
+
+NUM_LEDS = const(12)
+OFF = const(0x000000)
+GREEN = const(0x00FF00)
+AMBER = const(0xFFA000)
+RED = const(0xFF0000)
+
+
+class LED_Bar:
+
+    def __init__(self, full_scale, warn, steps=NUM_LEDS * 2, start=0.0, centre_out=False):
+        """
+        Args:
+            full_scale (float): input value that lights the whole bar
+            warn (float): input value at or above which every LED shows red
+            steps (int): quantisation steps between `start` and `full_scale`
+            start (float): input value below which the bar is dark (shift light start rpm/speed)
+            centre_out (bool): light from the middle outwards instead of left to right
+        """
+        self.start = start
+        self.scale = steps / (full_scale - start)
+        self.steps = steps
+        self.warn_level = int((warn - start) * self.scale)
+        self.centre_out = centre_out
+        self.table = self._build_table()
+        self.level = -1
+
+    def _colour(self, led):
+        if led < NUM_LEDS // 2:
+            return GREEN
+        if led < NUM_LEDS * 5 // 6:
+            return AMBER
+        return RED
+
+    def _pattern(self, level):
+        if level > self.steps:
+            return (RED,) * NUM_LEDS
+        lit = (level * NUM_LEDS + self.steps - 1) // self.steps
+        leds = [OFF] * NUM_LEDS
+        if self.centre_out:
+            half = NUM_LEDS // 2
+            for i in range((lit + 1) // 2):
+                leds[half - 1 - i] = leds[half + i] = self._colour(2 * i)
+        else:
+            for i in range(lit):
+                leds[i] = self._colour(i)
+        return tuple(leds)
+
+    def _build_table(self):
+        # levels 0..steps fill the bar, the extra last entry is the warning pattern
+        return tuple(self._pattern(level) for level in range(self.steps + 2))
+
+    def update(self, value):
+        level = int((value - self.start) * self.scale)
+        if level >= self.warn_level:
+            level = self.steps + 1
+        elif level > self.steps:
+            level = self.steps
+        elif level < 0:
+            level = 0
+        if level != self.level:
+            self.level = level
+            vts.leds(*self.table[level])
+
+    def reset(self):
+        """Blanks the bar and forces the next update to write the LEDs."""
+        self.level = -1
+        vts.leds(*([OFF] * NUM_LEDS))
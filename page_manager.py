@@ -0,0 +1,101 @@
+##
+# @module    page_manager
+# @brief     Registered pages with cached, prebuilt display lists
+# @version   1.0
+##
+
+# Pages register a build function returning their gui list plus optional
+# enter/leave hooks. Built lists are kept until invalidated, and idle() -
+# called from the vsync callback - builds the swipe neighbours of the current
+# page one per frame, so a swipe only has to hand gui.show a ready list.
+
+import gui
+import utime
+from micropython import const
+
+FRAME_US = const(16667)
+
+
+class Page:
+    __slots__ = ('name', 'build', 'enter', 'leave', 'gui_l')
+
+    def __init__(self, name, build, enter=None, leave=None):
+        self.name = name
+        self.build = build
+        self.enter = enter
+        self.leave = leave
+        self.gui_l = None
+
+
+class Page_Manager:
+
+    def __init__(self, router=None, frame_us=FRAME_US):
+        """
+        Args:
+            router (Touch_Router, optional): its page is kept in step with the current page
+            frame_us (int): switch time budget, slower switches are counted in `slow_switches`
+        """
+        self.router = router
+        self.frame_us = frame_us
+        self.pages = {}
+        self.order = []  # swipeable pages, left to right
+        self.current = None
+        self.last_switch_us = 0
+        self.max_switch_us = 0
+        self.slow_switches = 0
+
+    def register(self, name, build, enter=None, leave=None, swipe=True):
+        self.pages[name] = Page(name, build, enter, leave)
+        if swipe:
+            self.order.append(name)
+
+    def invalidate(self, name=None):
+        """Drops cached lists, e.g. after a unit change. All pages if `name` is None."""
+        if name is not None:
+            self.pages[name].gui_l = None
+            return
+        for page in self.pages.values():
+            page.gui_l = None
+
+    def _ready(self, page):
+        if page.gui_l is None:
+            page.gui_l = page.build()
+        return page.gui_l
+
+    def show(self, name):
+        start = utime.ticks_us()
+        old = self.pages.get(self.current)
+        page = self.pages[name]
+        if old is not None and old.leave is not None:
+            old.leave()
+        self.current = name
+        if self.router is not None:
+            self.router.page = name
+        if page.enter is not None:
+            page.enter()
+        gui.show(self._ready(page))
+        self.last_switch_us = utime.ticks_diff(utime.ticks_us(), start)
+        if self.last_switch_us > self.max_switch_us:
+            self.max_switch_us = self.last_switch_us
+        if self.last_switch_us > self.frame_us:
+            self.slow_switches += 1
+
+    def step(self, step):
+        """Shows the swipe page `step` places from the current one, if there is one."""
+        if self.current not in self.order:
+            return
+        i = self.order.index(self.current) + step
+        if 0 <= i < len(self.order):
+            self.show(self.order[i])
+
+    def idle(self):
+        """Prebuilds at most one uncached neighbour of the current page."""
+        if self.current not in self.order:
+            return
+        i = self.order.index(self.current)
+        for j in (i + 1, i - 1):
+            if 0 <= j < len(self.order):
+                page = self.pages[self.order[j]]
+                if page.gui_l is None:
+                    page.gui_l = page.build()
+                    return
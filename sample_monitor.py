@@ -0,0 +1,161 @@
+##
+# @module    sample_monitor
+# @brief     Dropped sample, duplicate and delivery jitter monitor
+# @version   1.0
+##
+
+# Compares each sample's GNSS timestamp with the previous one and with when
+# the callback actually ran, which separates the two ways the display can
+# stutter:
+#   gaps/lost   timestamps further apart than the sample period, the
+#               engine didn't produce (or deliver) those samples, GNSS side
+#   duplicates  the same timestamp delivered twice
+#   late        timestamps in step but the callback ran more than a period
+#               behind them, i.e. our processing held up the delivery
+#   overruns    callbacks that took longer than a sample period themselves
+#   behind      the UI loop fell behind the callback: process_samples found
+#               more samples waiting in the handoff ring than arrive in
+#               `lag_ms`, the newest had waited longer than that, or the
+#               ring was full and folded samples
+# Jitter is the difference between the spacing of callback arrivals and
+# the spacing of their timestamps, kept as a histogram of `bins` buckets of
+# `bin_us` (the last bucket collects everything above). Everything is
+# preallocated so check(), done() and drained() don't allocate.
+
+import gui
+import utime
+from array import array
+from micropython import const
+
+DAY_MS = const(86400000)
+OK = const(0)
+GNSS = const(1)
+LAGGING = const(2)
+# indicator text and colour per state
+STATUS_TEXT = ('', 'GAP', 'LAG')
+STATUS_COLOUR = (0xFFFFFF, 0xFFA000, 0xFF0000)
+
+
+class Sample_Monitor:
+
+    def __init__(self, rate_hz, bins=8, bin_us=None, hold_s=5, lag_ms=100):
+        """
+        Args:
+            rate_hz (float): expected sample rate
+            bins (int): jitter histogram buckets
+            bin_us (int): width of a histogram bucket, a quarter of the period by default
+            hold_s (float): seconds the warning stays up after the last problem
+            lag_ms (int): longest a sample may wait in the handoff ring before the UI loop counts as behind
+        """
+        self.period_ms = 1000 / rate_hz
+        self.period_us = int(1000000 / rate_hz)
+        self.lag_us = lag_ms * 1000
+        self.lag_depth = int(lag_ms * rate_hz / 1000) + 1
+        self.colours = tuple(gui.DL_COLOR(c) for c in STATUS_COLOUR)
+        self.bin_us = bin_us or self.period_us // 4
+        self.histogram = array('H', [0] * bins)
+        self.hold = int(hold_s * rate_hz)
+        self.text = ['']
+        self.colour = [self.colours[OK]]
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+        self.samples = 0
+        self.gaps = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.late = 0
+        self.overruns = 0
+        self.behind = 0
+        self.folded = 0
+        self.max_busy_us = 0
+        self.max_jitter_us = 0
+        self.last_ms = -1
+        self.last_us = 0
+        self.start_us = 0
+        self.status = OK
+        self.countdown = 0
+        self.text[0] = ''
+        self.colour[0] = self.colours[OK]
+
+    def _flag(self, status):
+        # processing problems win over GNSS ones while both are showing
+        if status > self.status or not self.countdown:
+            self.status = status
+            self.text[0] = STATUS_TEXT[status]
+            self.colour[0] = self.colours[status]
+        self.countdown = self.hold
+
+    def check(self, utc_ms):
+        """Call first thing in the data callback with the sample's timestamp."""
+        now = utime.ticks_us()
+        self.start_us = now
+        self.samples += 1
+        if self.countdown:
+            self.countdown -= 1
+            if not self.countdown:
+                self.status = OK
+                self.text[0] = ''
+                self.colour[0] = self.colours[OK]
+        if self.last_ms < 0:
+            self.last_ms = utc_ms
+            self.last_us = now
+            return
+        dt_ms = utc_ms - self.last_ms
+        if dt_ms < -DAY_MS // 2:
+            dt_ms += DAY_MS  # midnight
+        arrival_us = utime.ticks_diff(now, self.last_us)
+        self.last_us = now
+        if dt_ms <= 0:
+            self.duplicates += 1
+            self._flag(GNSS)
+            return
+        self.last_ms = utc_ms
+        if dt_ms > self.period_ms * 1.5:
+            self.gaps += 1
+            self.lost += int(dt_ms / self.period_ms + 0.5) - 1
+            self._flag(GNSS)
+        jitter = arrival_us - dt_ms * 1000
+        if jitter < 0:
+            jitter = -jitter
+        jitter = int(jitter)
+        if jitter > self.max_jitter_us:
+            self.max_jitter_us = jitter
+        b = jitter // self.bin_us
+        if b >= len(self.histogram):
+            b = len(self.histogram) - 1
+        if self.histogram[b] < 0xFFFF:
+            self.histogram[b] += 1
+        if arrival_us - dt_ms * 1000 > self.period_us:
+            self.late += 1
+            self._flag(LAGGING)
+
+    def done(self):
+        """Call last thing in the data callback."""
+        busy = utime.ticks_diff(utime.ticks_us(), self.start_us)
+        if busy > self.max_busy_us:
+            self.max_busy_us = busy
+        if busy > self.period_us:
+            self.overruns += 1
+            self._flag(LAGGING)
+
+    def drained(self, depth, latency_us, folded):
+        """Call from the UI loop after draining the handoff ring.
+
+        Args:
+            depth (int): samples that were waiting when the drain started
+            latency_us (int): arrival to release of the newest sample drained
+            folded (int): the ring's running count of folded samples
+        """
+        if folded != self.folded or depth > self.lag_depth or latency_us > self.lag_us:
+            self.folded = folded
+            self.behind += 1
+            self._flag(LAGGING)
+
+    def report(self):
+        print('samples {} gaps {} lost {} duplicates {} late {} overruns {} behind {} max busy {} us max jitter {} us'.format(
+            self.samples, self.gaps, self.lost, self.duplicates, self.late, self.overruns, self.behind,
+            self.max_busy_us, self.max_jitter_us))
+        print('jitter per {} us: {}'.format(self.bin_us, ' '.join(str(n) for n in self.histogram)))
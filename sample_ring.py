@@ -0,0 +1,109 @@
+##
+# @module    sample_ring
+# @brief     Single producer, single consumer sample ring for the vbox callback
+# @version   1.0
+##
+
+# The data callback copies raw fields into a preallocated slot and returns;
+# the UI loop drains every pending slot in one go. Only the producer
+# (reserve/commit) writes `head` and only the consumer (peek/release) writes
+# `tail`, so no locking is needed.
+#
+# When the consumer falls a whole ring behind, new samples are folded into
+# the newest slot instead of being dropped: whichever of the two samples has
+# the larger magnitude over the `weigh` fields is kept whole, every field
+# and its time, so a peak can't be lost however late the UI loop runs and
+# the slot is always a sample that actually happened. The consumer never
+# holds the newest slot while the ring is full, so folding can't change a
+# slot that's being read.
+#
+# Metrics: `max_depth` pending samples seen by peek(), `last_latency_us`
+# and `max_latency_us` from a sample's arrival to its release, `folded`
+# samples merged on overflow.
+
+import utime
+from array import array
+
+
+class Sample_Ring:
+
+    def __init__(self, fields, size=32, weigh=(), typecode='f'):
+        """
+        Args:
+            fields (int): values per sample
+            size (int): samples held before folding starts
+            weigh (tuple): field indices whose combined magnitude decides which sample survives folding,
+                the newest one wins ties
+            typecode (str): array type of the values
+        """
+        self.fields = fields
+        self.size = size
+        # one spare slot past the end that samples are written to while folding
+        self.values = array(typecode, [0] * ((size + 1) * fields))
+        self.times = array('l', [0] * size)
+        self.stamps = array('l', [0] * size)
+        self.weigh = tuple(weigh)
+        self.head = 0
+        self.tail = 0
+        self._folding = False
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.folded = 0
+        self.drained = 0
+        self.max_depth = 0
+        self.last_latency_us = 0
+        self.max_latency_us = 0
+
+    def reserve(self):
+        """Producer: index in `values` to write the next sample's fields at."""
+        if self.head - self.tail >= self.size:
+            self._folding = True
+            return self.size * self.fields
+        self._folding = False
+        return (self.head % self.size) * self.fields
+
+    def commit(self, time_ms):
+        """Producer: publishes the sample written after reserve()."""
+        if self._folding:
+            v = self.values
+            slot = (self.head - 1) % self.size
+            newest = slot * self.fields
+            spare = self.size * self.fields
+            old = 0.0
+            new = 0.0
+            for i in self.weigh:
+                old += v[newest + i] * v[newest + i]
+                new += v[spare + i] * v[spare + i]
+            if new >= old:
+                for i in range(self.fields):
+                    v[newest + i] = v[spare + i]
+                self.times[slot] = time_ms
+            self.folded += 1
+            return
+        slot = self.head % self.size
+        self.times[slot] = time_ms
+        self.stamps[slot] = utime.ticks_us()
+        self.head += 1
+
+    def peek(self):
+        """Consumer: slot of the oldest pending sample, or -1 if there's none."""
+        depth = self.head - self.tail
+        if not depth:
+            return -1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return self.tail % self.size
+
+    def release(self):
+        """Consumer: frees the slot returned by peek()."""
+        latency = utime.ticks_diff(utime.ticks_us(), self.stamps[self.tail % self.size])
+        self.last_latency_us = latency
+        if latency > self.max_latency_us:
+            self.max_latency_us = latency
+        self.tail += 1
+        self.drained += 1
+
+    def report(self):
+        print('sample ring: size {} drained {} max depth {} folded {} latency last {} us max {} us'.format(
+            self.size, self.drained, self.max_depth, self.folded, self.last_latency_us, self.max_latency_us))
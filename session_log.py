@@ -0,0 +1,148 @@
+##
+# @module    session_log
+# @brief     Buffered binary session logger
+# @version   1.0
+##
+
+# File layout (all little endian):
+#   header block  - '<4sHHHB' magic b'GFLH', version, block size, record size,
+#                   format length, then the ustruct format string and the
+#                   comma separated channel names, zero padded to the block size
+#   data blocks   - '<4sIHHII' magic b'GFLB', sequence, record count, record
+#                   size, dropped records so far, crc32 of the payload, then
+#                   `count` fixed width records, zero padded to the block size
+# Every block is the same size so writes to the SD card stay aligned, and a
+# torn write at power loss only costs the last block (its crc won't match).
+
+import ustruct as us
+import ubinascii
+import uos
+from micropython import const
+
+BLOCK_SIZE = const(4096)
+VERSION = const(1)
+FILE_MAGIC = b'GFLH'
+BLOCK_MAGIC = b'GFLB'
+HEADER_FMT = '<4sHHHB'
+BLOCK_FMT = '<4sIHHII'
+BLOCK_HDR_SIZE = const(20)
+
+
+class Session_Logger:
+    """Logs fixed width records into two preallocated blocks.
+
+    `log` only packs into the block being filled and is safe to call from
+    the sample callback. `flush` writes any full block to the card and must
+    only be called from the UI loop (e.g. the vsync callback).
+    """
+
+    def __init__(self, channels, directory='/sd', prefix='session', ext='gfl', block_size=BLOCK_SIZE):
+        """
+        Args:
+            channels (tuple): (name, ustruct code) pairs in record order
+            directory (str): where session files are created
+            prefix (str): file name prefix, files are <prefix>_NNN.<ext>
+            block_size (int): size of each block written to the card
+        """
+        self.names = [c[0] for c in channels]
+        self.fmt = '<' + ''.join(c[1] for c in channels)
+        self.rec_size = us.calcsize(self.fmt)
+        self.block_size = block_size
+        self.per_block = (block_size - BLOCK_HDR_SIZE) // self.rec_size
+        self.directory = directory
+        self.prefix = prefix
+        self.ext = ext
+        self.buffers = (bytearray(block_size), bytearray(block_size))
+        self.active = False
+        self.file = None
+        self.path = None
+        self._reset()
+
+    def _reset(self):
+        self.dropped = 0
+        self.records = 0
+        self.blocks = 0
+        self._fill = 0
+        self._count = 0
+        self._pending = -1
+
+    def _next_path(self):
+        last = -1
+        start = self.prefix + '_'
+        end = '.' + self.ext
+        for name in uos.listdir(self.directory):
+            if name.startswith(start) and name.endswith(end):
+                try:
+                    last = max(last, int(name[len(start):-len(end)]))
+                except ValueError:
+                    pass
+        return '{}/{}{:03d}{}'.format(self.directory, start, last + 1, end)
+
+    def start(self):
+        if self.active:
+            return
+        self._reset()
+        self.path = self._next_path()
+        self.file = open(self.path, 'wb')
+        header = bytearray(self.block_size)
+        fmt = self.fmt.encode()
+        us.pack_into(HEADER_FMT, header, 0, FILE_MAGIC, VERSION, self.block_size, self.rec_size, len(fmt))
+        pos = us.calcsize(HEADER_FMT)
+        names = ','.join(self.names).encode()
+        header[pos:pos + len(fmt)] = fmt
+        pos += len(fmt)
+        header[pos:pos + len(names)] = names
+        try:
+            self.file.write(header)
+            self.file.flush()
+        except OSError:
+            # e.g. a full card, close the file so the next start can retry
+            self.file.close()
+            self.file = None
+            raise
+        self.active = True
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self.flush()
+        if self._count:
+            buf = self.buffers[self._fill]
+            start = BLOCK_HDR_SIZE + self._count * self.rec_size
+            buf[start:] = bytes(self.block_size - start)
+            self._write_block(buf, self._count)
+            self._count = 0
+        self.file.close()
+        self.file = None
+
+    def log(self, *values):
+        """Packs one record, counting it as dropped if both blocks are full."""
+        if not self.active:
+            return
+        if self._count == self.per_block:
+            # Only the producer swaps blocks, so a flush can never see a
+            # block that is still being written to
+            if self._pending >= 0:
+                self.dropped += 1
+                return
+            self._pending = self._fill
+            self._fill ^= 1
+            self._count = 0
+        us.pack_into(self.fmt, self.buffers[self._fill], BLOCK_HDR_SIZE + self._count * self.rec_size, *values)
+        self._count += 1
+
+    def flush(self):
+        """Writes the full block to the card if there is one waiting."""
+        if self._pending < 0 or self.file is None:
+            return
+        self._write_block(self.buffers[self._pending], self.per_block)
+        self._pending = -1
+
+    def _write_block(self, buf, count):
+        crc = ubinascii.crc32(memoryview(buf)[BLOCK_HDR_SIZE:])
+        us.pack_into(BLOCK_FMT, buf, 0, BLOCK_MAGIC, self.blocks, count, self.rec_size, self.dropped, crc)
+        self.file.write(buf)
+        self.file.flush()
+        self.blocks += 1
+        self.records += count
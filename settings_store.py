@@ -0,0 +1,96 @@
+##
+# @module    settings_store
+# @brief     Versioned settings file on the SD card with debounced writes
+# @version   1.0
+##
+
+# Settings are a small JSON object, {"version": n, "settings": {...}},
+# read once by load() before the first page is built. set() only marks the
+# store dirty; service() (called from the vsync callback) writes the file
+# once nothing has changed for `delay_ms`, so cycling through a unit button
+# costs one write. Writes go to a temporary file that replaces the old one,
+# so a power cut mid write leaves the previous settings in place.
+#
+# Values missing from the file, of a different type than their default or
+# from a newer version of the file fall back to the defaults.
+
+import ujson
+import uos
+import utime
+
+VERSION = 1
+
+
+class Settings_Store:
+
+    def __init__(self, path, defaults, delay_ms=2000):
+        """
+        Args:
+            path (str): settings file, e.g. '/sd/gforce.json'
+            defaults (dict): setting name -> default value, also fixes each setting's type
+            delay_ms (int): quiet time after the last change before it's written
+        """
+        self.path = path
+        self.defaults = defaults
+        self.values = dict(defaults)
+        self.delay_ms = delay_ms
+        self.dirty = False
+        self.due = 0
+        self.writes = 0
+
+    def load(self):
+        blob = None
+        # the temporary file only survives if power went between the remove and rename in save()
+        for path in (self.path, self.path + '.tmp'):
+            try:
+                with open(path, 'r') as f:
+                    blob = ujson.load(f)
+                break
+            except (OSError, ValueError):
+                pass  # no card, first boot or a damaged file
+        if not isinstance(blob, dict) or blob.get('version', 0) > VERSION:
+            return self.values
+        stored = blob.get('settings', {})
+        for name, default in self.defaults.items():
+            value = stored.get(name)
+            if type(value) is type(default):
+                self.values[name] = value
+        return self.values
+
+    def get(self, name):
+        return self.values[name]
+
+    def set(self, name, value):
+        if self.values.get(name) == value:
+            return
+        self.values[name] = value
+        self.dirty = True
+        self.due = utime.ticks_add(utime.ticks_ms(), self.delay_ms)
+
+    def service(self):
+        """Writes pending changes once they've settled, call from the UI loop."""
+        if self.dirty and utime.ticks_diff(utime.ticks_ms(), self.due) >= 0:
+            self.save()
+
+    def flush(self):
+        """Writes pending changes now, e.g. when leaving the settings page."""
+        if self.dirty:
+            self.save()
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                ujson.dump({'version': VERSION, 'settings': self.values}, f)
+            try:
+                uos.remove(self.path)  # FAT won't rename over an existing file
+            except OSError:
+                pass
+            uos.rename(tmp, self.path)
+        except OSError:
+            # card missing or full, try again after another delay
+            self.due = utime.ticks_add(utime.ticks_ms(), self.delay_ms)
+            return False
+        self.dirty = False
+        self.writes += 1
+        return True
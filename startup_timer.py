@@ -0,0 +1,53 @@
+##
+# @module    startup_timer
+# @brief     Duration of each boot phase up to the first sample
+# @version   1.0
+##
+
+# Created first thing at boot; mark() closes the phase that has been
+# running since the last mark, so the phases add up to the total. The
+# frame callback marks `frame_phase` the first time it runs, i.e. once a
+# frame has actually been rendered, and `framed` is True after that.
+# finish() closes the last phase and prints the report once, after which
+# `done` is True and the timer costs the caller one attribute check.
+
+import utime
+
+
+class Startup_Timer:
+
+    def __init__(self, frame_phase=None):
+        """
+        Args:
+            frame_phase (str, optional): phase marked by the first frame callback, reported as time to first frame
+        """
+        self.frame_phase = frame_phase
+        self.framed = False
+        self.start = utime.ticks_ms()
+        self.last = self.start
+        self.phases = []
+        self.done = False
+
+    def mark(self, name):
+        now = utime.ticks_ms()
+        self.phases.append((name, utime.ticks_diff(now, self.last)))
+        self.last = now
+        if name == self.frame_phase:
+            self.framed = True
+
+    def finish(self, name):
+        self.mark(name)
+        self.done = True
+        self.report()
+
+    def report(self):
+        total = 0
+        first_frame = None
+        for name, ms in self.phases:
+            total += ms
+            print('startup: {:<16} {:>6} ms'.format(name, ms))
+            if name == self.frame_phase:
+                first_frame = total
+        if first_frame is not None:
+            print('startup: {:<16} {:>6} ms'.format('to first frame', first_frame))
+        print('startup: {:<16} {:>6} ms{}'.format('total', total, '' if self.done else ' (no sample yet)'))
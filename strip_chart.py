@@ -0,0 +1,143 @@
+##
+# @module    strip_chart
+# @brief     Scrolling min/max strip chart updated through gui.redraw()
+# @version   1.1
+##
+
+# Each column holds the min and max of the samples that fell into it, drawn
+# as a bar, so short spikes survive however long the window is. Columns live
+# in a preallocated ring of display list words, three per column: a slot
+# word followed by the bar's two vertices. Scrolling doesn't move any
+# vertices: the slot word of the oldest column carries a VERTEX_TRANSLATE_X
+# that shifts it to the left edge and the slot word of column 0 shifts the
+# wrapped part to its right (the other slot words are NOPs). Committing a
+# column rewrites two vertices and three slot words per trace, and the
+# display list size only depends on the number of columns.
+
+import gui
+from array import array
+from micropython import const
+
+_VERTEX_TRANSLATE_X = const(0x2B000000)
+_WORDS = const(3)
+
+
+def vertex_translate_x(px):
+    return _VERTEX_TRANSLATE_X | ((px * 16) & 0x1FFFF)
+
+
+class Strip_Chart:
+
+    def __init__(self, x, y, width, height, window_s, rate_hz, lo, hi, *colours, pitch=5):
+        """
+        Args:
+            x, y (int): top left corner
+            width, height (int): chart size in pixels
+            window_s (float): seconds of history across the width
+            rate_hz (float): expected sample rate
+            lo, hi (float): value range mapped to the chart height
+            colours (int): one RGB colour per trace
+            pitch (int): column width in pixels, display list cost is 3 words per column per trace
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.pitch = pitch
+        self.columns = width // pitch
+        self.lo = lo
+        self.scale = height / (hi - lo)
+        self.traces = len(colours)
+        self.colours = colours
+        # fraction of a column each sample advances by
+        self.step = self.columns / (window_s * rate_hz)
+        self.phase = 0.0
+        self.head = 0
+        self.mins = array('f', [0.0] * self.traces)
+        self.maxs = array('f', [0.0] * self.traces)
+        self.last = array('f', [0.0] * self.traces)
+        self.empty = True
+        base = self.to_px(0.0 if lo <= 0.0 <= hi else lo)
+        self.verts = []
+        for _ in colours:
+            v = []
+            for k in range(self.columns):
+                v.append(gui.DL_NOP())
+                v.append(gui.DL_VERTEX2F(x + k * pitch, base))
+                v.append(gui.DL_VERTEX2F(x + (k + 1) * pitch, base + 1))
+            v[0] = vertex_translate_x(0)
+            self.verts.append(v)
+
+    def __call__(self):
+        gui_l = [
+            [gui.DL_SAVE_CONTEXT()],
+            [gui.DL_COLOR_RGB(0, 0, 0)],
+            [gui.PRIM_LINE_STRIP, [
+                gui.DL_LINE_WIDTH(1),
+                gui.DL_VERTEX2F(self.x - 1, self.y - 1),
+                gui.DL_VERTEX2F(self.x + self.width, self.y - 1),
+                gui.DL_VERTEX2F(self.x + self.width, self.y + self.height),
+                gui.DL_VERTEX2F(self.x - 1, self.y + self.height),
+                gui.DL_VERTEX2F(self.x - 1, self.y - 1),
+            ]],
+        ]
+        for colour, verts in zip(self.colours, self.verts):
+            gui_l.append([gui.DL_COLOR(colour)])
+            gui_l.append([gui.PRIM_RECTS, verts])
+        gui_l.append([vertex_translate_x(0), gui.DL_RESTORE_CONTEXT()])
+        return gui_l
+
+    def to_px(self, value):
+        px = self.y + self.height - int((value - self.lo) * self.scale)
+        if px < self.y:
+            return self.y
+        if px > self.y + self.height - 1:
+            return self.y + self.height - 1
+        return px
+
+    def add(self, *values):
+        """Adds one sample, one value per trace."""
+        mins = self.mins
+        maxs = self.maxs
+        if self.empty:
+            for i in range(self.traces):
+                v = values[i]
+                # start each column from the previous column's last value so
+                # the trace stays joined up between columns
+                mins[i] = min(v, self.last[i])
+                maxs[i] = max(v, self.last[i])
+            self.empty = False
+        else:
+            for i in range(self.traces):
+                v = values[i]
+                if v < mins[i]:
+                    mins[i] = v
+                elif v > maxs[i]:
+                    maxs[i] = v
+        for i in range(self.traces):
+            self.last[i] = values[i]
+        self.phase += self.step
+        while self.phase >= 1.0:
+            self.phase -= 1.0
+            self._commit()
+
+    def _commit(self):
+        k = self.head
+        left = self.x + k * self.pitch
+        head = k + 1 if k + 1 < self.columns else 0
+        # oldest column (head) at the left edge, newest at the right
+        wrapped = vertex_translate_x((self.columns - head) * self.pitch if head else 0)
+        oldest = vertex_translate_x(-head * self.pitch)
+        nop = gui.DL_NOP()
+        for i in range(self.traces):
+            verts = self.verts[i]
+            j = k * _WORDS
+            verts[j + 1] = gui.DL_VERTEX2F(left, self.to_px(self.maxs[i]))
+            verts[j + 2] = gui.DL_VERTEX2F(left + self.pitch, self.to_px(self.mins[i]) + 1)
+            if k:
+                verts[j] = nop
+            if head:
+                verts[head * _WORDS] = oldest
+            verts[0] = wrapped
+        self.head = head
+        self.empty = True
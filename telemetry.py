@@ -0,0 +1,203 @@
+##
+# @module    telemetry
+# @brief     Live sample stream in batched binary frames over UDP
+# @version   1.0
+##
+
+# Runs under MicroPython (publisher) and CPython (host receiver decoding).
+#
+# push() packs a record into a preallocated ring and never blocks: when the
+# ring is full the oldest record is overwritten. service(), called from the
+# UI loop, sends `batch` records per frame, or whatever is queued once the
+# oldest has waited `max_wait_ms`. Only push() writes the head and ring and
+# only service() writes the tail, so a sample arriving mid frame can at
+# worst overwrite records being copied, in which case the frame is thrown
+# away and those records are counted as dropped.
+#
+# Frames (little endian):
+#   data    '<2sBBHIII' b'GT', version, record count, record size, frame
+#           sequence, sequence of the first record, records dropped so far,
+#           then the records packed with the schema's ustruct format
+#   schema  '<2sBB' b'GS', version, format length, then the format string and
+#           the comma separated channel names. Sent on start() and every
+#           `schema_every` frames so a receiver can join at any time.
+# A gap in frame sequence is a lost packet, a gap in record sequence that
+# isn't also a lost packet is a record dropped on the device.
+
+try:
+    import ustruct as us
+except ImportError:
+    import struct as us
+try:
+    import usocket as socket
+except ImportError:
+    import socket
+try:
+    import utime
+except ImportError:
+    utime = None
+
+VERSION = 1
+DATA_MAGIC = b'GT'
+SCHEMA_MAGIC = b'GS'
+DATA_FMT = '<2sBBHIII'
+SCHEMA_FMT = '<2sBB'
+DATA_HDR_SIZE = 18
+PORT = 9870
+
+
+class Schema_Mismatch(ValueError):
+    """A data frame whose record size doesn't match the schema it's decoded with."""
+
+
+class Telemetry:
+
+    def __init__(self, channels, host, port=PORT, batch=8, size=64, max_wait_ms=250, schema_every=32, sink=None):
+        """
+        Args:
+            channels (tuple): (name, ustruct code) pairs in record order, as for Session_Logger
+            host (str): receiver IP address, a literal so start() never waits on DNS
+            port (int): receiver UDP port
+            batch (int): records per frame
+            size (int): records the ring holds before the oldest are dropped
+            max_wait_ms (int): longest a record waits for its batch to fill
+            schema_every (int): data frames between schema frames
+            sink (callable): sends one frame instead of the UDP socket (e.g. a UART write),
+                the buffer it's passed is reused for the next frame
+        """
+        self.names = [c[0] for c in channels]
+        self.fmt = '<' + ''.join(c[1] for c in channels)
+        self.rec_size = us.calcsize(self.fmt)
+        self.address = (host, port)
+        self.batch = batch
+        self.size = size
+        self.max_wait_ms = max_wait_ms
+        self.schema_every = schema_every
+        self.sink = sink
+        self.sock = None
+        self.ring = bytearray(size * self.rec_size)
+        self.ring_mv = memoryview(self.ring)
+        self.frame = bytearray(DATA_HDR_SIZE + batch * self.rec_size)
+        self.frame_mv = memoryview(self.frame)
+        fmt = self.fmt.encode()
+        self.schema = us.pack(SCHEMA_FMT, SCHEMA_MAGIC, VERSION, len(fmt)) + fmt + ','.join(self.names).encode()
+        self.active = False
+        self.head = 0
+        self._reset()
+
+    def _reset(self):
+        self.tail = self.head
+        self.frames = 0
+        self.dropped = 0
+        self.send_errors = 0
+        self.waiting = -1
+
+    def start(self):
+        if self.active:
+            return
+        if self.sink is None:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+            self.address = socket.getaddrinfo(self.address[0], self.address[1])[0][-1]
+        self._reset()
+        self.active = True
+        self._send(self.schema)
+
+    def stop(self):
+        if not self.active:
+            return
+        self.service(True)
+        self.active = False
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def push(self, *values):
+        """Queues one record, safe to call from the sample callback."""
+        if not self.active:
+            return
+        us.pack_into(self.fmt, self.ring, (self.head % self.size) * self.rec_size, *values)
+        self.head += 1
+
+    def _send(self, buf):
+        try:
+            if self.sink is not None:
+                self.sink(buf)
+            else:
+                self.sock.sendto(buf, self.address)
+        except OSError:
+            # socket buffer full or no link, the frame is lost like any UDP packet
+            self.send_errors += 1
+
+    def service(self, flush=False):
+        """Sends at most one frame, call from the UI loop."""
+        if not self.active:
+            return
+        head = self.head
+        oldest = head - self.size
+        if self.tail < oldest:
+            self.dropped += oldest - self.tail
+            self.tail = oldest
+        count = head - self.tail
+        if not count:
+            self.waiting = -1
+            return
+        if count < self.batch and not flush:
+            now = utime.ticks_ms()
+            if self.waiting < 0:
+                self.waiting = now
+            if utime.ticks_diff(now, self.waiting) < self.max_wait_ms:
+                return
+        if count > self.batch:
+            count = self.batch
+        rs = self.rec_size
+        first = self.tail
+        pos = DATA_HDR_SIZE
+        for seq in range(first, first + count):
+            slot = (seq % self.size) * rs
+            self.frame_mv[pos:pos + rs] = self.ring_mv[slot:slot + rs]
+            pos += rs
+        if self.head - self.size > first:
+            return  # overwritten while copying, the next call counts them as dropped
+        us.pack_into(DATA_FMT, self.frame, 0, DATA_MAGIC, VERSION, count, rs,
+                     self.frames, first, self.dropped)
+        self._send(self.frame_mv[:pos])
+        self.tail = first + count
+        self.frames += 1
+        self.waiting = -1
+        if self.frames % self.schema_every == 0:
+            self._send(self.schema)
+
+
+def decode_schema(data):
+    """Returns (fmt, names) from a schema frame."""
+    pos = us.calcsize(SCHEMA_FMT)
+    if len(data) < pos:
+        raise ValueError('truncated schema frame')
+    magic, version, fmt_len = us.unpack_from(SCHEMA_FMT, data, 0)
+    if magic != SCHEMA_MAGIC or version != VERSION:
+        raise ValueError('not a schema frame')
+    if len(data) < pos + fmt_len:
+        raise ValueError('truncated schema frame')
+    fmt = bytes(data[pos:pos + fmt_len]).decode()
+    names = bytes(data[pos + fmt_len:]).decode().split(',')
+    try:
+        us.calcsize(fmt)
+    except Exception:
+        raise ValueError('bad record format')
+    return fmt, names
+
+
+def decode_frame(data, fmt):
+    """Returns ((frame seq, first record seq, dropped), [record tuples]) from a data frame."""
+    if len(data) < DATA_HDR_SIZE:
+        raise ValueError('truncated data frame')
+    magic, version, count, rec_size, frame_seq, first, dropped = us.unpack_from(DATA_FMT, data, 0)
+    if magic != DATA_MAGIC or version != VERSION:
+        raise ValueError('not a data frame')
+    if rec_size != us.calcsize(fmt):
+        raise Schema_Mismatch('frame does not match the schema')
+    if len(data) < DATA_HDR_SIZE + count * rec_size:
+        raise ValueError('truncated data frame')
+    records = [us.unpack_from(fmt, data, DATA_HDR_SIZE + i * rec_size) for i in range(count)]
+    return (frame_seq, first, dropped), records
@@ -0,0 +1,104 @@
+##
+# @module    touch
+# @brief     Grid bucketed hit regions and a single press/swipe router
+# @version   1.0
+##
+
+# Regions are registered per page into fixed size screen buckets, so a press
+# only tests the handful of regions that overlap its bucket however many
+# widgets a page has. Press and swipe events both go through Touch_Router,
+# which owns the swipe threshold and a shared debounce.
+
+import gui
+import utime
+from micropython import const
+
+SCREEN_W = const(800)
+SCREEN_H = const(480)
+BUCKET = const(40)
+
+
+class Hit_Index:
+
+    def __init__(self, width=SCREEN_W, height=SCREEN_H, bucket=BUCKET):
+        self.bucket = bucket
+        self.cols = (width + bucket - 1) // bucket
+        self.rows = (height + bucket - 1) // bucket
+        self.pages = {}
+
+    def add(self, page, x0, y0, x1, y1, cb):
+        """Registers `cb(press)` for presses with x0 <= x < x1 and y0 <= y < y1 on `page`."""
+        buckets = self.pages.get(page)
+        if buckets is None:
+            buckets = [None] * (self.cols * self.rows)
+            self.pages[page] = buckets
+        region = (x0, y0, x1, y1, cb)
+        for by in range(max(y0, 0) // self.bucket, min(y1 - 1, self.rows * self.bucket - 1) // self.bucket + 1):
+            for bx in range(max(x0, 0) // self.bucket, min(x1 - 1, self.cols * self.bucket - 1) // self.bucket + 1):
+                i = by * self.cols + bx
+                if buckets[i] is None:
+                    buckets[i] = [region]
+                else:
+                    buckets[i].append(region)
+
+    def clear(self, page):
+        self.pages.pop(page, None)
+
+    def find(self, page, x, y):
+        buckets = self.pages.get(page)
+        if buckets is None or x < 0 or y < 0:
+            return None
+        bx = x // self.bucket
+        by = y // self.bucket
+        if bx >= self.cols or by >= self.rows:
+            return None
+        regions = buckets[by * self.cols + bx]
+        if regions is None:
+            return None
+        for x0, y0, x1, y1, cb in regions:
+            if x0 <= x < x1 and y0 <= y < y1:
+                return cb
+        return None
+
+
+class Touch_Router:
+
+    def __init__(self, index, swipe_threshold=50, debounce_ms=250, on_swipe=None):
+        """
+        Args:
+            index (Hit_Index): regions to dispatch presses to
+            swipe_threshold (int): minimum horizontal swipe distance in pixels
+            debounce_ms (int): events closer than this to the last handled one are ignored
+            on_swipe (callable): called with +1 (swipe left, next page) or -1 (swipe right)
+        """
+        self.index = index
+        self.swipe_threshold = swipe_threshold
+        self.debounce_ms = debounce_ms
+        self.on_swipe = on_swipe
+        self.page = 0
+        self.last = utime.ticks_add(utime.ticks_ms(), -debounce_ms)
+
+    def _debounced(self):
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self.last) < self.debounce_ms:
+            return True
+        self.last = now
+        return False
+
+    def press_cb(self, press):
+        cb = self.index.find(self.page, press[3], press[4])
+        if cb is not None and not self._debounced():
+            cb(press)
+
+    def swipe_cb(self, gui_l, start):
+        if start or self.on_swipe is None:
+            return
+        dx = gui.swipe_info().dx
+        if dx <= -self.swipe_threshold:
+            step = 1
+        elif dx >= self.swipe_threshold:
+            step = -1
+        else:
+            return
+        if not self._debounced():
+            self.on_swipe(step)
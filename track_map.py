@@ -0,0 +1,346 @@
+##
+# @module    track_map
+# @brief     Driven line from GNSS position, simplified online and coloured by G
+# @version   1.0
+##
+
+# Positions are projected to metres east/north of the first fix
+# (equirectangular, fine over a circuit) and simplified as they arrive:
+#   radial       points closer than `min_step_m` to the last kept point are skipped
+#   window       skipped points are held in a small window; once any of them
+#                is further than `tolerance_m` from the line between the last
+#                kept point and the newest, the point before the newest is kept
+# The line lives in a preallocated list of `capacity` display list words (a
+# colour word only where the G colour changes, then the vertex) padded with
+# NOPs, so the page costs the same whatever has been driven. The last used
+# word follows the car. When the words run out, the tolerance doubles and
+# the kept points are simplified again with Douglas-Peucker, which drops
+# points on straights first and keeps corner shape, until the line fits
+# with room for the next point however twisty or colourful it is.
+#
+# The view is fitted to the bounds of the kept points plus a margin, so it
+# only has to be refitted (every vertex word rewritten in place, markers
+# included) when the car leaves it. Markers are drawn like shape_V2's
+# filled Custom_Shape, but their words are built once by mark() and their
+# vertices moved in place, so only a new marker bumps `version` for the
+# page to be rebuilt. Positions go through the sample ring as single precision
+# floats, which is about 0.4 m of latitude: under a pixel at circuit scale.
+
+import ft8xx as ft
+import gui
+import math
+from array import array
+from micropython import const
+
+EARTH_R = 6371000.0
+G = 9.80665
+_NOP = const(0x2D000000)
+
+# colour of a point from its G: (min G, palette offset), palette rows are
+# coasting, braking, accelerating and cornering at three intensities
+_LEVELS = ((0.9, 3), (0.5, 2), (0.2, 1))
+_PALETTE = (
+    gui.RGB(120, 120, 120),
+    gui.RGB(255, 150, 150), gui.RGB(255, 60, 60), gui.RGB(200, 0, 0),
+    gui.RGB(150, 230, 150), gui.RGB(50, 200, 50), gui.RGB(0, 140, 0),
+    gui.RGB(150, 190, 255), gui.RGB(60, 120, 255), gui.RGB(0, 50, 200),
+)
+COAST = const(0)
+BRAKE = const(1)
+ACCEL = const(4)
+CORNER = const(7)
+
+
+def g_colour(lat_g, long_g):
+    """Palette index for a point from its lateral and longitudinal G."""
+    alat = -lat_g if lat_g < 0 else lat_g
+    along = -long_g if long_g < 0 else long_g
+    if along >= alat:
+        m = along
+        base = BRAKE if long_g < 0 else ACCEL
+    else:
+        m = alat
+        base = CORNER
+    for level, offset in _LEVELS:
+        if m >= level:
+            return base + offset - 1
+    return COAST
+
+
+class Track_Map:
+
+    def __init__(self, x, y, width, height, capacity=800, tolerance_m=1.0, min_step_m=3.0, window=16, margin=0.15):
+        """
+        Args:
+            x, y (int): top left corner
+            width, height (int): map size in pixels
+            capacity (int): display list words for the line, vertices plus colour changes
+            tolerance_m (float): starting sideways error allowed when dropping points
+            min_step_m (float): points closer than this to the last kept one are skipped
+            window (int): skipped points checked against the tolerance
+            margin (float): fraction of the view left around the track when refitting
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.tolerance = tolerance_m
+        self.min_step = min_step_m
+        self.margin = margin
+        self.xs = array('f', [0.0] * capacity)
+        self.ys = array('f', [0.0] * capacity)
+        self.cs = bytearray(capacity)
+        self.win_x = array('f', [0.0] * window)
+        self.win_y = array('f', [0.0] * window)
+        self.win_c = bytearray(window)
+        self.palette = tuple(gui.DL_COLOR(c) for c in _PALETTE)
+        self.words = [_NOP] * (capacity + 2)
+        self.words[0] = gui.DL_LINE_WIDTH(2)
+        self.markers = []
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.win = 0
+        self.used = 1
+        self.colour = -1
+        self.origin = None
+        self.cos_lat = 1.0
+        self.decimations = 0
+        self.version = 0
+        self.view = (0.0, 0.0, 1.0)  # centre east, centre north, pixels per metre
+        self.bounds = None
+        self.markers = []
+        for i in range(1, len(self.words)):
+            self.words[i] = _NOP
+
+    def __call__(self):
+        gui_l = [
+            [gui.DL_SAVE_CONTEXT()],
+            [gui.PRIM_LINE_STRIP, self.words],
+            [gui.DL_RESTORE_CONTEXT()],
+        ]
+        for marker in self.markers:
+            gui_l.extend(marker[3])
+        return gui_l
+
+    def to_px(self, east, north):
+        ce, cn, scale = self.view
+        return (self.x + self.width / 2 + (east - ce) * scale,
+                self.y + self.height / 2 - (north - cn) * scale)
+
+    def _vertex(self, east, north):
+        ce, cn, scale = self.view
+        return gui.DL_VERTEX2F(self.x + self.width / 2 + (east - ce) * scale,
+                               self.y + self.height / 2 - (north - cn) * scale)
+
+    def project(self, lat_rad, lng_rad):
+        if self.origin is None:
+            self.origin = (lat_rad, lng_rad)
+            self.cos_lat = math.cos(lat_rad)
+        return ((lng_rad - self.origin[1]) * self.cos_lat * EARTH_R,
+                (lat_rad - self.origin[0]) * EARTH_R)
+
+    def add(self, lat_rad, lng_rad, lat_g, long_g):
+        """Adds one position fix with the G measured there."""
+        east, north = self.project(lat_rad, lng_rad)
+        self.add_local(east, north, lat_g, long_g)
+
+    def add_local(self, east, north, lat_g, long_g):
+        """add() for a position already projected with project()."""
+        colour = g_colour(lat_g, long_g)
+        if not self.count:
+            self._keep(east, north, colour)
+            return
+        n = self.count - 1
+        dx = east - self.xs[n]
+        dy = north - self.ys[n]
+        if dx * dx + dy * dy < self.min_step * self.min_step:
+            self._tail(east, north)
+            return
+        win = self.win
+        if win == len(self.win_x) or (win and self._deviates(east, north)):
+            # the point before this one is the furthest the line can go straight
+            self._keep(self.win_x[win - 1], self.win_y[win - 1], self.win_c[win - 1])
+            win = 0
+        self.win_x[win] = east
+        self.win_y[win] = north
+        self.win_c[win] = colour
+        self.win = win + 1
+        self._tail(east, north)
+
+    def _deviates(self, east, north):
+        n = self.count - 1
+        ax = self.xs[n]
+        ay = self.ys[n]
+        dx = east - ax
+        dy = north - ay
+        length = math.sqrt(dx * dx + dy * dy)
+        limit = self.tolerance * length
+        for i in range(self.win):
+            # perpendicular distance times the segment length
+            d = (self.win_x[i] - ax) * dy - (self.win_y[i] - ay) * dx
+            if d > limit or d < -limit:
+                return True
+        return False
+
+    def mark(self, fill, points):
+        """Adds a marker at the newest kept point.
+
+        Args:
+            fill (int): RGB fill colour
+            points (tuple): outline as (dx, dy) pixel offsets from the marker position
+        """
+        if not self.count:
+            return
+        # outline from the marker position round the points and back, as Custom_Shape draws it
+        verts = [0] * (len(points) + 2)
+        edge = self.x + self.width
+        gui_l = [
+            [gui.DL_SAVE_CONTEXT(), gui.DL_LINE_WIDTH(2), gui.DL_COLOR(0), gui.DL_BEGIN(gui.PRIM_LINE_STRIP)],
+            verts,
+            [gui.DL_END(), gui.DL_STENCIL_OP(ft.STENCILOP_INCR, ft.STENCILOP_INCR), gui.DL_COLOR_MASK(0, 0, 0, 0),
+             gui.DL_BEGIN(gui.PRIM_EDGE_STRIP_L)],
+            verts,
+            [gui.DL_END(), gui.DL_COLOR_MASK(1, 1, 1, 1), gui.DL_COLOR(fill),
+             gui.DL_STENCIL_FUNC(ft.ALPHAFUNC_EQUAL, 1, 255), gui.DL_BEGIN(gui.PRIM_EDGE_STRIP_L),
+             gui.DL_VERTEX2F(edge, self.y), gui.DL_VERTEX2F(edge, self.y + self.height), gui.DL_END(),
+             gui.DL_STENCIL_FUNC(ft.ALPHAFUNC_ALWAYS, 0, 255), gui.DL_CLEAR(0, 1, 0), gui.DL_RESTORE_CONTEXT()],
+        ]
+        marker = (self.xs[self.count - 1], self.ys[self.count - 1], points, gui_l, verts)
+        self._place(marker)
+        self.markers.append(marker)
+        self.version += 1
+
+    def _place(self, marker):
+        east, north, points, _, verts = marker
+        px, py = self.to_px(east, north)
+        verts[0] = gui.DL_VERTEX2F(px, py)
+        for i, (dx, dy) in enumerate(points):
+            verts[i + 1] = gui.DL_VERTEX2F(px + dx, py + dy)
+        verts[-1] = verts[0]
+
+    def _keep(self, east, north, colour):
+        while self.count == self.capacity or self.used + 3 > self.capacity:
+            self._decimate()
+        n = self.count
+        self.xs[n] = east
+        self.ys[n] = north
+        self.cs[n] = colour
+        self.count = n + 1
+        b = self.bounds
+        if b is None:
+            self.bounds = [east, north, east, north]
+            self._refit()
+            return
+        if east < b[0] or north < b[1] or east > b[2] or north > b[3]:
+            if east < b[0]:
+                b[0] = east
+            if north < b[1]:
+                b[1] = north
+            if east > b[2]:
+                b[2] = east
+            if north > b[3]:
+                b[3] = north
+            if not self._in_view(east, north):
+                self._refit()
+                return
+        self._append(n)
+
+    def _append(self, n):
+        if self.cs[n] != self.colour:
+            self.colour = self.cs[n]
+            self.words[self.used] = self.palette[self.colour]
+            self.used += 1
+        self.words[self.used] = self._vertex(self.xs[n], self.ys[n])
+        self.used += 1
+
+    def _tail(self, east, north):
+        # the word after the line follows the car until the next point is kept
+        self.words[self.used] = self._vertex(east, north)
+
+    def _in_view(self, east, north):
+        ce, cn, scale = self.view
+        return (abs(east - ce) * scale <= self.width / 2 - 2
+                and abs(north - cn) * scale <= self.height / 2 - 2)
+
+    def _refit(self):
+        b = self.bounds
+        span_e = max(b[2] - b[0], 50.0)
+        span_n = max(b[3] - b[1], 50.0)
+        scale = min(self.width / span_e, self.height / span_n) * (1.0 - 2 * self.margin)
+        self.view = ((b[0] + b[2]) / 2, (b[1] + b[3]) / 2, scale)
+        self._rebuild()
+        for marker in self.markers:
+            self._place(marker)
+
+    def _rebuild(self):
+        words = self.words
+        self.used = 1
+        self.colour = -1
+        for i in range(self.count):
+            self._append(i)
+        for i in range(self.used, len(words)):
+            words[i] = _NOP
+
+    def _decimate(self):
+        """Doubles the tolerance and Douglas-Peucker simplifies the kept points
+        with it, repeating until the line fits with room for another point."""
+        while True:
+            self.tolerance *= 2
+            self.decimations += 1
+            self._simplify()
+            if self.count < self.capacity and self._words_needed() + 3 <= self.capacity:
+                break
+        self._rebuild()
+
+    def _words_needed(self):
+        """Words _rebuild() would use, the line width plus vertices and colour changes."""
+        n = self.count
+        words = 1 + n
+        colour = -1
+        for i in range(n):
+            if self.cs[i] != colour:
+                colour = self.cs[i]
+                words += 1
+        return words
+
+    def _simplify(self):
+        n = self.count
+        keep = bytearray(n)
+        keep[0] = 1
+        keep[n - 1] = 1
+        xs = self.xs
+        ys = self.ys
+        stack = [(0, n - 1)]
+        while stack:
+            a, b = stack.pop()
+            dx = xs[b] - xs[a]
+            dy = ys[b] - ys[a]
+            length = math.sqrt(dx * dx + dy * dy)
+            worst = 0.0
+            at = -1
+            for i in range(a + 1, b):
+                ex = xs[i] - xs[a]
+                ey = ys[i] - ys[a]
+                if length < 0.5:
+                    # a closed lap starts and ends in the same place, use the distance from it
+                    d = math.sqrt(ex * ex + ey * ey)
+                else:
+                    d = abs(ex * dy - ey * dx) / length
+                if d > worst:
+                    worst = d
+                    at = i
+            if at >= 0 and worst > self.tolerance:
+                keep[at] = 1
+                stack.append((a, at))
+                stack.append((at, b))
+        j = 0
+        for i in range(n):
+            if keep[i]:
+                xs[j] = xs[i]
+                ys[j] = ys[i]
+                self.cs[j] = self.cs[i]
+                j += 1
+        self.count = j
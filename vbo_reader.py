@@ -0,0 +1,230 @@
+##
+# @module    vbo_reader
+# @brief     Indexed, lazily parsed .vbo file reader
+# @version   1.0
+##
+
+# Runs under MicroPython (on-device replay) and CPython (host tools).
+#
+# A .vbo file is text with one row per sample, so the index records the byte
+# offset and start time of every block of `block_rows` rows. Columns are only
+# converted to float for the names asked for, and any row or time can be
+# reached by seeking to its block instead of reading from the top.
+#
+# The index is cached next to the file as <name>.vbi:
+#   '<4sHIIIHI' magic b'VBIX', version, file size, data offset, row count,
+#               block rows, block count
+#   '<H' + names, space separated
+#   block count * '<I' byte offsets, then block count * '<f' start times
+
+from array import array
+try:
+    import ustruct as us
+except ImportError:
+    import struct as us
+try:
+    import uos as os
+except ImportError:
+    import os
+
+INDEX_MAGIC = b'VBIX'
+INDEX_VERSION = 1
+INDEX_FMT = '<4sHIIIHI'
+BLOCK_ROWS = 256
+# column names loggers use for each channel, first match wins
+ALIASES = {
+    'time': ('time',),
+    'speed': ('velocity', 'speed'),
+    'heading': ('heading',),
+    'lat': ('lat', 'latitude'),
+    'lon': ('long', 'longitude'),
+    'lat_g': ('lat_acc', 'latacc', 'lateral_acc'),
+    'long_g': ('long_acc', 'lngacc', 'longacc', 'longitudinal_acc'),
+}
+
+
+def hhmmss_to_s(value):
+    """Converts a .vbo HHMMSS.SS time to seconds since midnight."""
+    hh = int(value // 10000)
+    mm = int(value // 100) % 100
+    return hh * 3600 + mm * 60 + (value % 100)
+
+
+class VBO_Reader:
+
+    def __init__(self, path, block_rows=BLOCK_ROWS, cache=True):
+        """
+        Args:
+            path (str): .vbo file to read
+            block_rows (int): rows per index block, smaller seeks faster but costs memory
+            cache (bool): load/save the index from/to <name>.vbi
+        """
+        self.path = path
+        self.index_path = (path[:-4] if path.lower().endswith('.vbo') else path) + '.vbi'
+        self.size = os.stat(path)[6]
+        if not (cache and self._load_index()):
+            self.block_rows = block_rows
+            self._build_index()
+            if cache:
+                self._save_index()
+        self.time_col = self.names.index('time') if 'time' in self.names else -1
+
+    def __len__(self):
+        return self.rows
+
+    def _build_index(self):
+        self.names = []
+        self.offsets = array('I')
+        self.times = array('f')
+        self.rows = 0
+        pos = 0
+        with open(self.path, 'rb') as f:
+            section = None
+            while True:
+                line = f.readline()
+                if not line:
+                    raise ValueError('no [data] section')
+                pos += len(line)
+                text = line.strip()
+                if text.startswith(b'['):
+                    section = text
+                    if section == b'[data]':
+                        break
+                elif section == b'[column names]' and text:
+                    self.names.extend(n.decode().lower() for n in text.split())
+            self.data_offset = pos
+            time_col = self.names.index('time') if 'time' in self.names else -1
+            first = None
+            last = 0.0
+            for line in f:
+                fields = line.split()
+                if len(fields) < len(self.names):
+                    # empty line or a row torn by power loss
+                    pos += len(line)
+                    continue
+                if self.rows % self.block_rows == 0:
+                    t = 0.0
+                    if time_col >= 0:
+                        t = hhmmss_to_s(float(fields[time_col]))
+                        if first is None:
+                            first = t
+                        t -= first
+                        while t < last:
+                            t += 86400  # crossed midnight
+                        last = t
+                    self.offsets.append(pos)
+                    self.times.append(t)
+                self.rows += 1
+                pos += len(line)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                hdr = f.read(us.calcsize(INDEX_FMT))
+                magic, version, size, data_offset, rows, block_rows, blocks = us.unpack(INDEX_FMT, hdr)
+                if magic != INDEX_MAGIC or version != INDEX_VERSION or size != self.size:
+                    return False
+                names_len = us.unpack('<H', f.read(2))[0]
+                self.names = f.read(names_len).decode().split()
+                raw = f.read(blocks * 8)
+        except (OSError, ValueError):
+            return False
+        if len(raw) != blocks * 8:
+            return False
+        self.data_offset = data_offset
+        self.rows = rows
+        self.block_rows = block_rows
+        self.offsets = array('I')
+        self.times = array('f')
+        for i in range(blocks):
+            self.offsets.append(us.unpack_from('<I', raw, i * 4)[0])
+            self.times.append(us.unpack_from('<f', raw, (blocks + i) * 4)[0])
+        return True
+
+    def _save_index(self):
+        blocks = len(self.offsets)
+        names = ' '.join(self.names).encode()
+        raw = bytearray(blocks * 8)
+        for i in range(blocks):
+            us.pack_into('<I', raw, i * 4, self.offsets[i])
+            us.pack_into('<f', raw, (blocks + i) * 4, self.times[i])
+        try:
+            with open(self.index_path, 'wb') as f:
+                f.write(us.pack(INDEX_FMT, INDEX_MAGIC, INDEX_VERSION, self.size, self.data_offset,
+                                self.rows, self.block_rows, blocks))
+                f.write(us.pack('<H', len(names)))
+                f.write(names)
+                f.write(raw)
+        except OSError:
+            pass  # read-only media, the index is rebuilt next time
+
+    def find(self, channel):
+        """Name of the column holding `channel` (a key of ALIASES), or None."""
+        for alias in ALIASES[channel]:
+            if alias in self.names:
+                return alias
+        return None
+
+    def _lines(self, start, stop):
+        """Yields the split fields of rows start..stop-1."""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return
+        block = start // self.block_rows
+        row = block * self.block_rows
+        ncols = len(self.names)
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[block])
+            for line in f:
+                fields = line.split()
+                if len(fields) < ncols:
+                    continue
+                if row >= start:
+                    yield fields
+                row += 1
+                if row >= stop:
+                    return
+
+    def columns(self, *names, start=0, stop=None):
+        """Parses only the named columns, returns one array('f') per name."""
+        cols = [self.names.index(n.lower()) for n in names]
+        out = [array('f') for _ in cols]
+        for fields in self._lines(start, stop):
+            for arr, c in zip(out, cols):
+                arr.append(float(fields[c]))
+        return out
+
+    def column(self, name, start=0, stop=None):
+        return self.columns(name, start=start, stop=stop)[0]
+
+    def rows_from(self, start, *names):
+        """Iterates tuples of the named columns from row `start`, for replay."""
+        cols = [self.names.index(n.lower()) for n in names]
+        for fields in self._lines(start, None):
+            yield tuple(float(fields[c]) for c in cols)
+
+    def row_at_time(self, t):
+        """Index of the first row at or after `t` seconds from the start of the file."""
+        if self.time_col < 0 or not self.rows:
+            raise ValueError('no time column')
+        lo, hi = 0, len(self.times) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.times[mid] <= t:
+                lo = mid
+            else:
+                hi = mid - 1
+        row = lo * self.block_rows
+        base = self.times[lo]
+        first = None
+        for fields in self._lines(row, None):
+            now = hhmmss_to_s(float(fields[self.time_col]))
+            if first is None:
+                first = now
+            elapsed = now - first
+            if elapsed < 0:
+                elapsed += 86400
+            if base + elapsed >= t - 1e-3:
+                return row
+            row += 1
+        return self.rows